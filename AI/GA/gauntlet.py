@@ -14,6 +14,11 @@ pygame.display.set_mode((1, 1))
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../Tetris')))
 from main import Main
+from headless import HeadlessGame, SECONDS_PER_PIECE
+from timers import SimClock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from worker_pool import AIWorkerPool
 # Tetrominos and TetrisAI are already handled by Main/Game for your setup
 
 # --- AGENT WEIGHTS CONFIG ---
@@ -149,10 +154,22 @@ agent_weights_list = [agent_weights_dict[name] for name in agent_names]
 N_AGENTS = 2  # Max parallel agent processes (not total agent count — all agents always run)
 GAMES_PER_AGENT = 20
 TIMEOUT_SECONDS = 600  # 10 minutes per game
+HEADLESS = True        # Pure simulation (Tetris/headless.py); False = full pygame Main
+MAX_PIECES = int(TIMEOUT_SECONDS / SECONDS_PER_PIECE)  # Headless budget, same simulated length
+POOL_WORKERS = 2       # Realtime only: AI workers shared by all games of one agent
+SIM_CLOCK = True       # Realtime only: simulated game time (one 60 FPS frame per game.run())
+RECORD_REPLAYS = True  # Save every game's seed + moves to <run>/replays/ (Tetris/replay.py)
 # Auto-version: create a timestamped run folder
 run_id = datetime.datetime.now().strftime("run_%Y%m%d_%H%M%S")
 misc_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'results', 'gauntlet', run_id)
 os.makedirs(misc_dir, exist_ok=True)
+replay_dir = os.path.join(misc_dir, "replays")
+
+def save_replay(agent_name, game_num, replay):
+    if replay is None:
+        return
+    os.makedirs(replay_dir, exist_ok=True)
+    replay.save(os.path.join(replay_dir, f"{agent_name}_game_{game_num:03d}.replay"))
 
 def run_agent(agent_name, agent_weights, num_games, timeout_sec):
     import pygame
@@ -168,22 +185,43 @@ def run_agent(agent_name, agent_weights, num_games, timeout_sec):
                 "AgentName", "GameNumber", "Score", "NumTetrises", "Num3Line", "Num2Line", "Num1Line", "TimeSurvived", "TotalLinesCleared", "CurrentLevel"
             ])
         from AI.GA.tetris_ai import TetrisAI as GATetrisAI
-        
+        worker_pool = None
+
         for game_num in range(num_games):
             try:
                 print(f"[START] Agent {agent_name}, Game {game_num+1}")
+                if HEADLESS:
+                    g = HeadlessGame(weights=agent_weights, record=RECORD_REPLAYS).run(MAX_PIECES)
+                    save_replay(agent_name, game_num + 1, g.replay)
+                    writer.writerow([
+                        agent_name,
+                        game_num + 1,
+                        g.score,
+                        g.num_tetris,
+                        g.num_3line,
+                        g.num_2line,
+                        g.num_1line,
+                        g.time_sec,
+                        g.lines,
+                        g.level
+                    ])
+                    f.flush()
+                    print(f"[END]   Agent {agent_name}, Game {game_num+1}")
+                    continue
+                if worker_pool is None:
+                    worker_pool = AIWorkerPool(POOL_WORKERS)
                 g = Main(use_async_ai=True, ai_class=GATetrisAI,
-                         ai_kwargs={'weights': agent_weights})
-                start_time = time.time()
+                         ai_kwargs={'weights': agent_weights}, worker_pool=worker_pool,
+                         render=False, sim_clock=SimClock() if SIM_CLOCK else None,
+                         record=RECORD_REPLAYS)
                 while not g.game.is_game_over:
-                    elapsed = time.time() - start_time
-                    if elapsed > timeout_sec:
+                    if g.score.elapsed() > timeout_sec:
                         g.game.is_game_over = True
                         break
                     g.game.run()
                 time_survived = getattr(g.score, "frozen_time", None)
                 if time_survived is None:
-                    time_survived = int(time.time() - start_time)
+                    time_survived = g.score.elapsed()
                 total_lines = getattr(g.lines, "lines", 0)
                 current_level = getattr(g.score, "levels", 1)
                 writer.writerow([
@@ -199,14 +237,18 @@ def run_agent(agent_name, agent_weights, num_games, timeout_sec):
                     current_level
                 ])
                 f.flush()  # Ensure data is written immediately
+                save_replay(agent_name, game_num + 1, g.replay)
                 print(f"[END]   Agent {agent_name}, Game {game_num+1}")
-                g.close()    # Clean up worker process
+                g.close()    # Release pool endpoints
             except Exception as e:
                 print(f"Exception in agent {agent_name}, game {game_num+1}: {e}")
                 import traceback
                 traceback.print_exc()
                 break  # Stop further games for this agent on error
 
+        if worker_pool is not None:
+            worker_pool.close()
+
 
 def run_agent_wrapper(args):
     return run_agent(*args)
@@ -29,6 +29,9 @@ class GA:
         # To store the adaptive hyperparameters per generation
         self.param_history = []
 
+        # Piece-sequence seeds shared by every agent, per generation
+        self.seed_history = {}
+
         # Stagnation detection
         self.best_fitness_history = []
         self.stagnation_counter = 0
@@ -88,6 +91,23 @@ class GA:
 
         return self.stagnation_surge_active
 
+    # --- Common Seeds ---
+    def generation_seeds(self, generation, n_seeds):
+        """
+        Seeds every agent plays in this generation (common random numbers:
+        agents are compared on the same piece sequences). Drawn once per
+        generation and kept in seed_history; optimize.py draws the next
+        generation's seeds before each checkpoint, so a generation resumed
+        from a checkpoint replays the same sequences.
+        """
+        seeds = self.seed_history.get(generation)
+        if seeds is None or len(seeds) < n_seeds:
+            sysrand = random.SystemRandom()
+            seeds = list(seeds or []) + [sysrand.randrange(1 << 62)
+                                         for _ in range(n_seeds - len(seeds or []))]
+            self.seed_history[generation] = seeds
+        return seeds[:n_seeds]
+
     # --- Population Diversity ---
     def population_diversity(self):
         """Measure population diversity as mean per-gene standard deviation."""
@@ -375,6 +395,7 @@ class GA:
             "best_ever_fitness": getattr(self, 'best_ever_fitness', float('-inf')),
             "stagnation_counter": getattr(self, 'stagnation_counter', 0),
             "best_fitness_history": getattr(self, 'best_fitness_history', []),
+            "seed_history": self.seed_history,
         }
         with open(self.checkpoint_file, "wb") as f:
             pickle.dump(checkpoint, f)
@@ -388,6 +409,7 @@ class GA:
         self.best_ever_fitness = checkpoint.get("best_ever_fitness", float('-inf'))
         self.stagnation_counter = checkpoint.get("stagnation_counter", 0)
         self.best_fitness_history = checkpoint.get("best_fitness_history", [])
+        self.seed_history = checkpoint.get("seed_history", {})
 
         # Population size migration — pad or truncate
         while len(self.population) < self.population_size:
@@ -6,6 +6,7 @@ import time
 import sys
 import numpy as np
 import csv
+import math
 import multiprocessing
 
 pygame.init()
@@ -13,29 +14,55 @@ pygame.display.set_mode((1, 1))
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../Tetris')))
 from main import Main
+from headless import HeadlessGame, SECONDS_PER_PIECE
+from batch_env import BatchTetrisEnv
+from timers import SimClock
 from genetic_algorithm import GA
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from worker_pool import AIWorkerPool
+
 # --- CONFIGURATION ---
 N_WEIGHTS = 10
 GENERATIONS = 50
 POP_SIZE = 50
 N_TRAYS = 4
 TIMEOUT_SECONDS = 600   # 10 minutes — balanced agents need room to show consistency
+HEADLESS = True         # Pure simulation (Tetris/headless.py); False = full pygame Main
+MAX_PIECES = int(TIMEOUT_SECONDS / SECONDS_PER_PIECE)   # Headless budget, same simulated length
+BATCH_ENV = True        # Headless only: step the whole tray in lockstep (Tetris/batch_env.py)
+POOL_WORKERS_PER_TRAY = max(1, (os.cpu_count() or 1) // N_TRAYS)   # Realtime only: shared AI workers
+SIM_CLOCK = True        # Realtime only: simulated game time (one 60 FPS frame per game.run())
+RECORD_REPLAYS = True   # Save every game's seed + moves (Tetris/replay.py), ~1 byte per piece
+RACING = True           # Stop agents that cannot reach the elite before their games end (race())
+RACE_SLICES = 40        # Racing plays a tray in this many equal slices of a full game
+RACE_ROUNDS = (0.125, 0.25, 0.5)   # Checks for agents to stop, as fractions of a full game
+RACE_Z = 1.5            # Standard errors of the remaining play an agent may still make up
+COMMON_SEEDS = True     # All agents of a tray play the same piece sequence (one seed per tray per
+                        # generation, kept in the checkpoint); False = a fresh seed per game
 
 misc_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'results', 'GA')
 os.makedirs(misc_dir, exist_ok=True)
 AGENT_LOG_FILE = os.path.join(misc_dir, "agent_log.csv")
 GA_LOG_FILE = os.path.join(misc_dir, "ga_log.csv")
 CHECKPOINT_FILE = os.path.join(misc_dir, "ga_checkpoint.pkl")
+REPLAY_DIR = os.path.join(misc_dir, "replays")
 
 def tray_log_name(prefix, tray):
     return os.path.join(misc_dir, f"{prefix}_tray_{tray}.csv")
 
+def save_replays(generation, tray, replays):
+    """Write replays/gen_<generation>/tray_<tray>_agent_<idx>.replay"""
+    gen_dir = os.path.join(REPLAY_DIR, f"gen_{generation:03d}")
+    os.makedirs(gen_dir, exist_ok=True)
+    for idx, replay in enumerate(replays):
+        replay.save(os.path.join(gen_dir, f"tray_{tray}_agent_{idx:02d}.replay"))
+
 AGENT_LOG_HEADER = [
     "Generation", "AgentID", "Score", "Lines", "Level", "Time",
     "W1_AggHeight", "W2_Holes", "W3_Blockades", "W4:Bumpiness", "W5:AlmostFull",
     "W6_FillsWell", "W7:ClearBonus4", "W8:ClearBonus3", "W9:ClearBonus2", "W10:ClearBonus1",
-    "Num1Line", "Num2Line", "Num3Line", "NumTetris"
+    "Num1Line", "Num2Line", "Num3Line", "NumTetris", "Stopped"
 ]
 
 GA_LOG_HEADER = [
@@ -46,91 +73,268 @@ GA_LOG_HEADER = [
     "W6:FillsWell", "W7:ClearBonus4", "W8:ClearBonus3", "W9:ClearBonus2", "W10:ClearBonus1"
 ]
 
-def run_tray(tray, generation, population, fitness_fn, result_queue):
-    import os
-    os.environ["SDL_VIDEODRIVER"] = "dummy"
-    import pygame
-    pygame.init()
-    pygame.display.set_mode((1, 1))
-
-    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../Tetris')))
-    from main import Main
-
-    print(f"[{time.strftime('%X')}] [TRAY {tray}] Starting for Gen {generation}")
-    tray_agent_log_rows = []
-    fitness_values = np.zeros(len(population))
-    agent_stats = np.zeros((len(population), 8)) # Score, Lines, Level, Time, Num1,2,3,Tetris
-
+def headless_stats(g):
+    """(score, lines, level, time_sec, num_1line, num_2line, num_3line, num_tetris)"""
+    return (g.score, g.lines, g.level, g.time_sec,
+            g.num_1line, g.num_2line, g.num_3line, g.num_tetris)
+
+def batch_env_stats(env):
+    """headless_stats() for every game of a BatchTetrisEnv."""
+    return list(zip(env.score.tolist(), env.lines.tolist(), env.level.tolist(),
+                    env.time_sec.tolist(), env.num_1line.tolist(), env.num_2line.tolist(),
+                    env.num_3line.tolist(), env.num_tetris.tolist()))
+
+def start_realtime_games(population, worker_pool=None, seed=None):
+    """
+    One full pygame Main per agent (no window). seed: the piece sequence
+    every game plays, or None for one per game.
+    """
     from AI.GA.tetris_ai import TetrisAI as GATetrisAI
-    
-    start_times = [time.time()] * len(population)
+
     games = []
     for i in range(len(population)):
-        g = Main(use_async_ai=True, ai_class=GATetrisAI,
-                 ai_kwargs={'weights': population[i]})
+        g = Main(seed=seed, use_async_ai=True, ai_class=GATetrisAI,
+                 ai_kwargs={'weights': population[i]}, worker_pool=worker_pool,
+                 render=False, sim_clock=SimClock() if SIM_CLOCK else None,
+                 record=RECORD_REPLAYS)
         games.append(g)
-    done = [False] * len(population)
-    all_done = False
-
-    while not all_done:
-        all_done = True
-        for idx, main in enumerate(games):
-            if done[idx]:
+    return games
+
+def play_realtime_games(games, agents, max_seconds, worker_pool=None):
+    """
+    Round-robin the given games on each game's clock (simulated with
+    SIM_CLOCK, else wall time) until each is over or has played
+    max_seconds. TIMEOUT_SECONDS ends a game.
+    """
+    running = list(agents)
+    while running:
+        still_running = []
+        for idx in running:
+            main = games[idx]
+            if main.game.is_game_over:
                 continue
-            elapsed = time.time() - start_times[idx]
+            elapsed = main.score.elapsed()
             if elapsed > TIMEOUT_SECONDS:
                 main.game.is_game_over = True
                 if main.score.frozen_time is None:
                     main.score.frozen_time = TIMEOUT_SECONDS
-                done[idx] = True
                 continue
-            if not main.game.is_game_over:
-                main.game.run()
-            else:
+            if elapsed > max_seconds:
+                continue    # Paused until the next round
+            main.game.run()
+            if main.game.is_game_over:
                 if main.score.frozen_time is None:
-                    main.score.frozen_time = int(elapsed)
-                done[idx] = True
-            if not done[idx]:
-                all_done = False
-
-    for idx, main in enumerate(games):
-        elapsed = time.time() - start_times[idx]
-        if main.score.frozen_time is None:
-            main.score.frozen_time = min(int(elapsed), TIMEOUT_SECONDS)
-        lines = getattr(main.lines, "lines", 0)
-        score = getattr(main.score, "score", 0)
-        time_sec = main.score.frozen_time
-        num_tetris = getattr(main.game, "num_tetris", 0)
-
-        fitness = fitness_fn(lines, score, time_sec, num_tetris)
-        fitness_values[idx] = fitness
+                    main.score.frozen_time = elapsed
+            else:
+                still_running.append(idx)
+        running = still_running
+        if worker_pool is not None:
+            worker_pool.flush()    # One batched request per worker per round
+
+def realtime_stats(main):
+    """headless_stats() of a Main game so far."""
+    time_sec = main.score.frozen_time
+    if time_sec is None:
+        time_sec = min(main.score.elapsed(), TIMEOUT_SECONDS)
+    return (
+        getattr(main.score, "score", 0),
+        getattr(main.lines, "lines", 0),
+        getattr(main.score, "levels", 1),
+        time_sec,
+        getattr(main.game, "num_1line", 0),
+        getattr(main.game, "num_2line", 0),
+        getattr(main.game, "num_3line", 0),
+        getattr(main.game, "num_tetris", 0),
+    )
+
+def run_realtime_games(population, worker_pool=None, seed=None):
+    """
+    Play every agent's Main game to game over or TIMEOUT_SECONDS.
+
+    Returns:
+        (per-agent stats, per-agent replays or None)
+    """
+    games = start_realtime_games(population, worker_pool, seed)
+    play_realtime_games(games, range(len(games)), TIMEOUT_SECONDS, worker_pool)
+    stats = [realtime_stats(main) for main in games]
+
+    # Clean up worker processes (or pool endpoints) for all games in this tray
+    for main in games:
+        main.close()
+    replays = [main.replay for main in games] if RECORD_REPLAYS else None
+    return stats, replays
+
+def project_fitness(stats, fitness_fn, until=None):
+    """
+    Fitness of a game that goes on at the line, tetris and score rates
+    it has shown so far and ends at `until` seconds (None: it survives
+    the full TIMEOUT_SECONDS).
+    """
+    score, lines, level, time_sec, n1, n2, n3, n4 = stats
+    if time_sec <= 0:
+        return fitness_fn(lines, score, time_sec, n4)
+    if until is None:
+        until = TIMEOUT_SECONDS
+    scale = until / time_sec
+    return fitness_fn(lines * scale, score * scale, until, n4 * scale)
+
+def slice_fitness(history, idx, fitness_fn):
+    """project_fitness() of each slice agent idx played, as if its whole game went that way."""
+    return np.array([
+        project_fitness([a - b for a, b in zip(after[idx], before[idx])], fitness_fn)
+        for before, after in zip(history, history[1:])
+    ])
+
+def race(n_agents, play, status, fitness_fn, elite_size):
+    """
+    Play the tray in RACE_SLICES slices and, after each RACE_ROUNDS
+    fraction, stop agents that cannot reach the elite.
+
+    An agent whose game is over has its exact fitness, a running one its
+    full-game projection (project_fitness); the elite cutoff is the
+    elite_size-th best of these. A running agent below the cutoff is
+    compared with the agent at the cutoff slice by slice: on a common
+    seed both played the same pieces, so the per-slice differences of
+    their projections mostly measure the weights. The agent is stopped
+    when its gap to the cutoff plus RACE_Z standard errors of the slices
+    still to play is below zero.
+
+    A stopped game never played its remaining time, so its projection
+    is discounted for the chance of dying before the end, at the death
+    rate the tray showed after the first round (dying halfway through
+    the remaining time).
+
+    Args:
+        play(fraction, agents): continue these agents' games up to fraction of a full game
+        status(): (per-agent stats so far, per-agent game over flags)
+
+    Returns:
+        (per-agent stats, per-agent fitness, per-agent stopped flags)
+    """
+    slices = RACE_SLICES if RACING else 1
+    checks = {round(f * slices) for f in RACE_ROUNDS} if RACING else set()
+    racing = list(range(n_agents))
+    stopped = [False] * n_agents
+    fitness = [0.0] * n_agents
+    history = [status()[0]]
+    for k in range(1, slices + 1):
+        play(k / slices, racing)
+        stats, over = status()
+        history.append(stats)
+        racing = [idx for idx in racing if not over[idx]]
+        if k not in checks or k < 2 or not racing:
+            continue
+
+        for idx in range(n_agents):
+            if not stopped[idx]:
+                score, lines, level, time_sec, n1, n2, n3, n4 = stats[idx]
+                fitness[idx] = (fitness_fn(lines, score, time_sec, n4) if over[idx]
+                                else project_fitness(stats[idx], fitness_fn))
+        cutoff = sorted(range(n_agents), key=lambda i: -fitness[i])[min(elite_size, n_agents) - 1]
+        reference = slice_fitness(history, cutoff, fitness_fn) if cutoff in racing else 0.0
+        left = slices - k
+        kept = []
+        for idx in racing:
+            gap = fitness[idx] - fitness[cutoff]
+            if gap < 0:
+                diff = slice_fitness(history, idx, fitness_fn) - reference
+                error = np.std(diff, ddof=1) * math.sqrt(left + left * left / k) / slices
+                if gap + RACE_Z * error < 0:
+                    stopped[idx] = True
+                    continue
+            kept.append(idx)
+        racing = kept
+
+    stats = history[-1]
+    start = TIMEOUT_SECONDS * min(checks) / slices if checks else TIMEOUT_SECONDS
+    deaths = sum(1 for idx, s in enumerate(stats) if over[idx] and s[3] > start)
+    exposure = sum(max(s[3] - start, 0) for s in stats)
+    death_rate = deaths / exposure if exposure > 0 else 0.0
+    for idx, (score, lines, level, time_sec, n1, n2, n3, n4) in enumerate(stats):
+        if stopped[idx]:
+            remaining = TIMEOUT_SECONDS - time_sec
+            survive = math.exp(-death_rate * remaining)
+            fitness[idx] = (survive * project_fitness(stats[idx], fitness_fn)
+                            + (1 - survive) * project_fitness(stats[idx], fitness_fn,
+                                                              time_sec + remaining / 2))
+        else:
+            fitness[idx] = fitness_fn(lines, score, time_sec, n4)
+    return stats, fitness, stopped
+
+def run_tray(tray, generation, population, fitness_fn, result_queue, worker_pool=None,
+             seed=None, elite_size=4):
+    import os
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    import pygame
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../Tetris')))
+
+    print(f"[{time.strftime('%X')}] [TRAY {tray}] Starting for Gen {generation}"
+          + (f" (seed {seed})" if seed is not None else ""))
+    tray_agent_log_rows = []
+    fitness_values = np.zeros(len(population))
+    agent_stats = np.zeros((len(population), 8)) # Score, Lines, Level, Time, Num1,2,3,Tetris
+    n = len(population)
+
+    if HEADLESS and BATCH_ENV:
+        # Whole tray in lockstep — one batched search per placement round.
+        seeds = [seed] * n if seed is not None else None
+        env = BatchTetrisEnv(population, seeds, record=RECORD_REPLAYS)
+        stats, fitness, stopped = race(
+            n,
+            lambda fraction, agents: env.run(math.ceil(MAX_PIECES * fraction), agents),
+            lambda: (batch_env_stats(env), env.is_game_over.tolist()),
+            fitness_fn, elite_size,
+        )
+        replays = env.replays
+    elif HEADLESS:
+        # One piece per step, no frame clock — games finish as fast as the CPU allows.
+        games = [HeadlessGame(seed, population[i], record=RECORD_REPLAYS) for i in range(n)]
+
+        def play(fraction, agents):
+            for idx in agents:
+                games[idx].run(math.ceil(MAX_PIECES * fraction))
+
+        stats, fitness, stopped = race(
+            n, play,
+            lambda: ([headless_stats(g) for g in games],
+                     [g.is_game_over for g in games]),
+            fitness_fn, elite_size,
+        )
+        replays = [g.replay for g in games] if RECORD_REPLAYS else None
+    else:
+        games = start_realtime_games(population, worker_pool, seed)
+        stats, fitness, stopped = race(
+            n,
+            lambda fraction, agents: play_realtime_games(
+                games, agents, TIMEOUT_SECONDS * fraction, worker_pool),
+            lambda: ([realtime_stats(main) for main in games],
+                     [main.game.is_game_over for main in games]),
+            fitness_fn, elite_size,
+        )
+        for main in games:
+            main.close()
+        replays = [main.replay for main in games] if RECORD_REPLAYS else None
+    if replays is not None:
+        save_replays(generation, tray, replays)
+    if any(stopped):
+        print(f"[{time.strftime('%X')}] [TRAY {tray}] Racing stopped {sum(stopped)}/{n} agents early")
+
+    for idx, (score, lines, level, time_sec, n1, n2, n3, n4) in enumerate(stats):
+        fitness_values[idx] = fitness[idx]
 
         agent_row = [
             generation,
             idx,
             score,
             lines,
-            getattr(main.score, "levels", 1),
+            level,
             time_sec,
-        ] + population[idx] + [
-            getattr(main.game, "num_1line", 0),
-            getattr(main.game, "num_2line", 0),
-            getattr(main.game, "num_3line", 0),
-            getattr(main.game, "num_tetris", 0),
-        ]
+        ] + population[idx] + [n1, n2, n3, n4, int(stopped[idx])]    # Stopped early by race()
         tray_agent_log_rows.append(agent_row)
-        agent_stats[idx,0] = score
-        agent_stats[idx,1] = lines
-        agent_stats[idx,2] = getattr(main.score, "levels", 1)
-        agent_stats[idx,3] = time_sec
-        agent_stats[idx,4] = getattr(main.game, "num_1line", 0)
-        agent_stats[idx,5] = getattr(main.game, "num_2line", 0)
-        agent_stats[idx,6] = getattr(main.game, "num_3line", 0)
-        agent_stats[idx,7] = getattr(main.game, "num_tetris", 0)
-
-    # Clean up worker processes for all games in this tray
-    for main in games:
-        main.close()
+        agent_stats[idx] = [score, lines, level, time_sec, n1, n2, n3, n4]
 
     with open(tray_log_name("agent_log", tray), "a", newline="") as f:
         csv.writer(f).writerows(tray_agent_log_rows)
@@ -194,6 +398,12 @@ if __name__ == '__main__':
         last_gen, history = ga.load_checkpoint()
         start_gen = last_gen + 1
 
+    # Realtime trays share long-lived AI worker pools across generations
+    # instead of spawning two processes per game.
+    pools = [None] * N_TRAYS
+    if not HEADLESS:
+        pools = [AIWorkerPool(POOL_WORKERS_PER_TRAY, batch=True) for _ in range(N_TRAYS)]
+
     generation = start_gen
     while generation < GENERATIONS:
         params = ga.current_params(generation)
@@ -203,12 +413,15 @@ if __name__ == '__main__':
             f"creep_scale={params['creep_scale']:.3f}, blend_prob={params['blend_prob']:.3f}, "
             f"uniform_chance={params['uniform_chance']:.3f}, creep_chance={params['creep_chance']:.3f})")
         t0 = time.time()
+        # Common random numbers: tray t plays seeds[t] for every agent
+        seeds = ga.generation_seeds(generation, N_TRAYS) if COMMON_SEEDS else [None] * N_TRAYS
         result_queue = multiprocessing.Queue()
         procs = []
         for tray in range(N_TRAYS):
             p = multiprocessing.Process(
                 target=run_tray,
-                args=(tray, generation, ga.population, ga.evaluate_agent_fitness, result_queue)
+                args=(tray, generation, ga.population, ga.evaluate_agent_fitness, result_queue,
+                      pools[tray], seeds[tray], ga.elite_size)
             )
             p.start()
             procs.append(p)
@@ -269,7 +482,13 @@ if __name__ == '__main__':
 
         ga.select_and_breed(fitness_values, generation)
         history.append(fitness_values)
+        if COMMON_SEEDS:
+            # Checkpoint the next generation's seeds before its trays start
+            ga.generation_seeds(generation + 1, N_TRAYS)
         ga.save_checkpoint(generation, history)
         generation += 1
 
+    for pool in pools:
+        if pool is not None:
+            pool.close()
     pygame.quit()
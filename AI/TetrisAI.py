@@ -2,32 +2,37 @@
 Tetris AI — Phase 7: Dual-Worker Hold + 2-Step Lookahead
 
 Zero object instantiation in the search loop. All placement evaluation
-uses pure integer math via TetrisCore. The only Pygame usage is in
-update() for timing (get_ticks) and executing moves on the real piece.
+uses pure integer math via TetrisCore. Timing comes from the game's
+clock (Game.get_ticks: wall time or a simulated SimClock); moves are
+executed on the real piece.
 
 Key changes from Phase 6:
   - Dual-worker architecture: Worker A = play current, Worker B = hold & play held
   - 2-step lookahead: current → next → next-next
   - Hold decision: compares play vs. hold branch scores, picks higher
   - SYNC fallback with hold awareness (no external workers needed)
+
+The async dual-worker plumbing is DualWorkerMixin (dual_worker.py),
+shared with the GA variant.
 """
 
 import os
 import sys
 
-import pygame
-from Tetris.settings import ROWS, COLUMNS
-
 # Ensure AI/ is importable when run from different entry points.
 sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
 
-from evaluator import find_best_move, find_best_move_with_hold
+from evaluator import (
+    BEAM_WIDTH, EXPECTIMAX_TIME_LIMIT, SEARCH_LOOKAHEAD,
+    find_best_move, find_best_move_for_mode,
+)
+from dual_worker import DualWorkerMixin
 
 
 # ---------------------------------------------------------------------------
 # Main AI class
 # ---------------------------------------------------------------------------
-class TetrisAI:
+class TetrisAI(DualWorkerMixin):
     """
     High-speed Tetris AI using pure integer math.
 
@@ -36,7 +41,9 @@ class TetrisAI:
     all board logic to TetrisCore static methods.
     """
 
-    def __init__(self, game, play_pipe=None, hold_pipe=None, **kwargs):
+    def __init__(self, game, play_pipe=None, hold_pipe=None,
+                 search_mode=SEARCH_LOOKAHEAD, beam_width=BEAM_WIDTH,
+                 time_limit=EXPECTIMAX_TIME_LIMIT, **kwargs):
         self.game = game
         self.last_action_time = 0
         self.delay = 60
@@ -45,16 +52,15 @@ class TetrisAI:
         self._cached_move = None
         self._cached_piece_id = None
 
-        # ---- Dual-worker pipes (Phase 7) ----
-        self._play_pipe = play_pipe      # Worker A: play current
-        self._hold_pipe = hold_pipe      # Worker B: hold & play held
-        self._piece_id_counter = 0
-        self._pending_piece_id = None
-        self._last_sent_piece_id = None
+        # ---- Search mode ----
+        # evaluator.SEARCH_MODES: 'lookahead' (hold-aware 1-step), 'beam'
+        # (preview queue) or 'expectimax' (beam + 7-bag chance layer)
+        self.search_mode = search_mode
+        self.beam_width = beam_width
+        self.time_limit = time_limit
 
-        # Store results from each worker
-        self._play_result = None         # (rot, x, score) from Worker A
-        self._hold_result = None         # (rot, x, score) from Worker B
+        # ---- Dual-worker pipes (Phase 7, dual_worker.py) ----
+        self._init_workers(play_pipe, hold_pipe)
 
         # ---- Heuristic weights (proven working values) ----
         # These are the original weights that produced good AI play.
@@ -71,11 +77,12 @@ class TetrisAI:
     # ------------------------------------------------------------------
     # Public entry point — called once per frame by Game.run()
     # ------------------------------------------------------------------
-    def update(self, next_shape, held_piece=None, is_held=False):
+    def update(self, next_shape, held_piece=None, is_held=False, next_shapes=None,
+               bag=None):
         if self.game.is_game_over or not self.game.tetromino or not next_shape:
             return
 
-        now = pygame.time.get_ticks()
+        now = self.game.get_ticks()    # Wall or simulated ms (Game.sim_clock)
 
         tetromino = self.game.tetromino
         shape = tetromino.shape
@@ -88,7 +95,7 @@ class TetrisAI:
             self._update_dual_async(
                 tetromino, shape, current_rot, current_px,
                 piece_id, next_shape,
-                held_piece, is_held, now
+                held_piece, is_held, now, next_shapes, bag
             )
             return
 
@@ -96,13 +103,12 @@ class TetrisAI:
         if now - self.last_action_time < self.delay:
             return
         if piece_id != self._cached_piece_id:
-            grid = [
-                [1 if self.game.game_data[r][c] else 0 for c in range(COLUMNS)]
-                for r in range(ROWS)
-            ]
+            grid = self.game.board    # Occupancy bitboard, kept by Game
             weights = self._get_weights()
-            result = find_best_move_with_hold(
-                grid, shape, next_shape, held_piece, is_held, weights
+            queue = (shape,) + tuple(next_shapes or (next_shape,))
+            result = find_best_move_for_mode(
+                self.search_mode, grid, queue, held_piece, is_held, weights,
+                bag, self.beam_width, self.time_limit
             )
             if result is None:
                 self._cached_piece_id = piece_id
@@ -124,132 +130,6 @@ class TetrisAI:
 
         self._execute_move(tetromino, best_rot, best_x, current_rot, current_px, now)
 
-    # ------------------------------------------------------------------
-    # Dual-worker async mode
-    # ------------------------------------------------------------------
-    def _update_dual_async(self, tetromino, shape, current_rot, current_px,
-                           piece_id, next_shape,
-                           held_piece, is_held, now):
-        """
-        Dual-worker async: send current board to BOTH workers simultaneously.
-        Worker A evaluates "play current piece" with 1-step lookahead.
-        Worker B evaluates "hold & play held piece" with 1-step lookahead.
-        Main process picks whichever branch scores higher.
-        """
-
-        # ---- Send to both workers when piece changes ----
-        if piece_id != self._last_sent_piece_id:
-            self._piece_id_counter += 1
-            self._last_sent_piece_id = piece_id
-            self._pending_piece_id = self._piece_id_counter
-            self._cached_move = None
-            self._play_result = None
-            self._hold_result = None
-
-            grid_tuple = tuple(
-                tuple(1 if self.game.game_data[r][c] else 0 for c in range(COLUMNS))
-                for r in range(ROWS)
-            )
-
-            # Worker A: evaluate playing the CURRENT piece
-            self._play_pipe.send(
-                (self._piece_id_counter, grid_tuple, shape, next_shape)
-            )
-
-            # Worker B: evaluate holding and playing the HELD piece
-            # Only send if hold is available this turn
-            if not is_held and self._hold_pipe is not None:
-                if held_piece is not None:
-                    # Swap: play held_piece, lookahead with next_shape
-                    self._hold_pipe.send(
-                        (self._piece_id_counter, grid_tuple, held_piece,
-                         next_shape)
-                    )
-                else:
-                    # First hold ever: play next_shape, no lookahead piece known
-                    self._hold_pipe.send(
-                        (self._piece_id_counter, grid_tuple, next_shape,
-                         None)
-                    )
-
-        # ---- Poll Worker A (play) ----
-        while self._play_pipe.poll():
-            recv_id, rot, x, score = self._play_pipe.recv()
-            if recv_id == self._pending_piece_id:
-                self._play_result = (rot, x, score) if rot is not None else None
-
-        # ---- Poll Worker B (hold) ----
-        if self._hold_pipe is not None:
-            while self._hold_pipe.poll():
-                recv_id, rot, x, score = self._hold_pipe.recv()
-                if recv_id == self._pending_piece_id:
-                    self._hold_result = (rot, x, score) if rot is not None else None
-
-        # ---- Decide: play or hold? ----
-        # Wait until at least Worker A has responded
-        if self._play_result is None and self._hold_result is None:
-            return    # Still waiting
-
-        play_score = self._play_result[2] if self._play_result else float("-inf")
-        hold_score = self._hold_result[2] if self._hold_result else float("-inf")
-
-        if hold_score > play_score and self._hold_result is not None:
-            # Hold is better — swap and re-evaluate will happen next frame
-            best_rot, best_x = self._hold_result[0], self._hold_result[1]
-            self._cached_move = (best_rot, best_x, True)    # should_hold = True
-        elif self._play_result is not None:
-            best_rot, best_x = self._play_result[0], self._play_result[1]
-            self._cached_move = (best_rot, best_x, False)   # should_hold = False
-        else:
-            return
-
-        # ---- Execute ----
-        best_rot, best_x, should_hold = self._cached_move
-
-        if should_hold:
-            self.game.hold_piece()
-            self._cached_piece_id = None     # Force re-evaluation after hold
-            self._cached_move = None
-            self._play_result = None
-            self._hold_result = None
-            return
-
-        rot_needed = (best_rot - current_rot) % 4
-        dx_needed = best_x - current_px
-
-        # Only delay the hard drop (same as before)
-        if rot_needed == 0 and dx_needed == 0:
-            if now - self.last_action_time < self.delay:
-                return
-
-        self._execute_move(tetromino, best_rot, best_x, current_rot, current_px, now)
-
-    def _execute_move(self, tetromino, best_rot, best_x, current_rot, current_px, now):
-        """Execute a computed move on the real tetromino."""
-        rotations_needed = (best_rot - current_rot) % 4
-        dx_needed = best_x - current_px
-
-        for _ in range(rotations_needed):
-            tetromino.rotate()
-
-        if dx_needed > 0:
-            for _ in range(dx_needed):
-                tetromino.move_horizontal(+1)
-        elif dx_needed < 0:
-            for _ in range(-dx_needed):
-                tetromino.move_horizontal(-1)
-
-        if rotations_needed == 0 and dx_needed == 0:
-            if hasattr(self.game, 'perform_hard_drop'):
-                self.game.perform_hard_drop()
-            elif hasattr(tetromino, 'hard_drop'):
-                tetromino.hard_drop()
-            else:
-                while tetromino.move_down():
-                    pass
-
-        self.last_action_time = now
-
     # ------------------------------------------------------------------
     # Helpers
     # ------------------------------------------------------------------
@@ -0,0 +1,409 @@
+"""
+Batched Heuristic Evaluator — NumPy, Zero Pygame Dependency
+
+Vectorized twin of the search in evaluator.py. Instead of calling
+cost_function() once per placement, every candidate placement of a
+shape is stacked into a (n_boards, rows, cols) occupancy array, the
+heuristic features are computed for all of them at once into a
+(n_placements, n_features) matrix, and the costs are weighted sums of
+its rows (weighted_cost()).
+
+The hold-aware 1-step lookahead of TetrisAI's sync path and
+HeadlessGame (evaluator.find_best_move_for_mode()), the workers and
+BatchTetrisEnv all search through this module.
+
+Feature columns (same order and sign convention as the weights):
+    [agg_height, holes, blockades, bumpiness, -almost_full,
+    -fills_well, -clear_4, -clear_3, -clear_2, -clear_1]
+
+Costs are summed column by column in weight order, the same order as
+evaluator._combine_cost(), so scores (and ties) match evaluator.py bit
+for bit.
+
+NO PYGAME IMPORTS ALLOWED IN THIS FILE.
+"""
+
+import os
+import sys
+
+import numpy as np
+
+# Ensure Tetris/ is importable (for settings and core)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "Tetris")))
+
+from Tetris.settings import COLUMNS, ROWS, TETROMINOS
+
+# Module-level constants
+_SPAWN_Y = -1
+_N_FEATURES = 10
+_NO_COLUMN = 1 << 20     # Sentinel for columns a rotation does not occupy
+
+
+def _build_placement_table(shape, cols=COLUMNS):
+    """
+    Candidate (rot, x) pairs for a shape as flat NumPy arrays.
+
+    Returns:
+        dict with rot (J,), x (J,), dx/dy (J, 4) absolute column / relative
+        row of each block, bottom (J, cols) lowest block offset per column
+        (_NO_COLUMN where unused) and min_by (J,).
+    """
+    rotations = TETROMINOS[shape]['rotations']
+    max_rot = 1 if shape == 'O' else 4
+    rot_l, x_l, dx_l, dy_l, bottom_l, min_by_l = [], [], [], [], [], []
+
+    for rot in range(max_rot):
+        blocks = rotations[rot]
+        min_bx = min(bx for bx, _ in blocks)
+        max_bx = max(bx for bx, _ in blocks)
+        for x in range(-min_bx, cols - max_bx):
+            bottom = [_NO_COLUMN] * cols
+            for bx, by in blocks:
+                c = x + bx
+                bottom[c] = by if bottom[c] == _NO_COLUMN else max(bottom[c], by)
+            rot_l.append(rot)
+            x_l.append(x)
+            dx_l.append([x + bx for bx, _ in blocks])
+            dy_l.append([by for _, by in blocks])
+            bottom_l.append(bottom)
+            min_by_l.append(min(by for _, by in blocks))
+
+    return {
+        'rot': np.array(rot_l, dtype=np.int64),
+        'x': np.array(x_l, dtype=np.int64),
+        'dx': np.array(dx_l, dtype=np.int64),
+        'dy': np.array(dy_l, dtype=np.int64),
+        'bottom': np.array(bottom_l, dtype=np.int64),
+        'min_by': np.array(min_by_l, dtype=np.int64),
+    }
+
+
+PLACEMENT_TABLES = {shape: _build_placement_table(shape) for shape in TETROMINOS}
+
+# Every shape's candidates in one table, for stacks where each board
+# places a different piece. SHAPES[i] is the shape with index i.
+SHAPES = list(TETROMINOS)
+SHAPE_INDEX = {shape: i for i, shape in enumerate(SHAPES)}
+MIXED_TABLE = {
+    key: np.concatenate([PLACEMENT_TABLES[shape][key] for shape in SHAPES])
+    for key in PLACEMENT_TABLES[SHAPES[0]]
+}
+_MIXED_OFFSET = np.cumsum([0] + [len(PLACEMENT_TABLES[shape]['rot']) for shape in SHAPES])
+
+
+def placement_table(shape):
+    """Candidate table used by expand(): per-shape, or MIXED_TABLE for an index array."""
+    return PLACEMENT_TABLES[shape] if isinstance(shape, str) else MIXED_TABLE
+
+
+_COLUMN_BITS = np.arange(COLUMNS)
+
+
+def occupancy(grid):
+    """Convert a 2D integer grid (or a bitboard) to a (rows, cols) boolean array."""
+    if len(grid) and isinstance(grid[0], int):
+        return (np.array(grid, dtype=np.int64)[:, None] >> _COLUMN_BITS) & 1 != 0
+    return np.asarray(grid) != 0
+
+
+def column_heights(boards):
+    """Column heights of a (n, rows, cols) boolean stack -> (n, cols)."""
+    rows = boards.shape[1]
+    top = boards.argmax(axis=1)
+    return np.where(boards.any(axis=1), rows - top, 0)
+
+
+def _landings(table, heights, rows, spawn_y):
+    """Valid (board, candidate) pairs and their landing rows, from the surface alone."""
+    bottom = table['bottom']
+    landing = rows - 1 - heights[:, None, :] - bottom[None, :, :]
+    landing = np.where(bottom[None, :, :] == _NO_COLUMN, _NO_COLUMN, landing)
+    drop_y = landing.min(axis=2)
+    valid = (drop_y >= spawn_y) & (drop_y + table['min_by'][None, :] >= 0)
+    parent, cand = np.nonzero(valid)
+    return parent, cand, drop_y[parent, cand]
+
+
+def expand(boards, shape, heights=None, spawn_y=_SPAWN_Y, build=True):
+    """
+    Every straight-drop placement of shape on every board in the stack.
+
+    Args:
+        boards: (n, rows, cols) boolean array
+        shape: Tetromino name, or an (n,) array of SHAPE_INDEX values to
+            place a different piece on each board
+        heights: Optional precomputed column_heights(boards)
+        build: When False, skip materializing the placed boards
+
+    Returns:
+        (parent, cand, xs, ys, placed):
+            parent (K,) index of the source board, cand (K,) index into
+            placement_table(shape), xs/ys (K, 4) absolute block cells and
+            placed (K, rows, cols) boards with the piece locked in (or None).
+    """
+    table = placement_table(shape)
+    rows = boards.shape[1]
+    if heights is None:
+        heights = column_heights(boards)
+
+    if table is MIXED_TABLE:
+        # Group boards by piece so each only scans its own shape's candidates.
+        shape = np.asarray(shape)
+        parts = []
+        for si in np.unique(shape):
+            b = np.nonzero(shape == si)[0]
+            p, c, y = _landings(PLACEMENT_TABLES[SHAPES[si]], heights[b], rows, spawn_y)
+            parts.append((b[p], c + _MIXED_OFFSET[si], y))
+        parent = np.concatenate([p for p, _, _ in parts])
+        cand = np.concatenate([c for _, c, _ in parts])
+        drop_y = np.concatenate([y for _, _, y in parts])
+    else:
+        parent, cand, drop_y = _landings(table, heights, rows, spawn_y)
+
+    xs = table['dx'][cand]
+    ys = drop_y[:, None] + table['dy'][cand]
+
+    placed = None
+    if build:
+        placed = boards[parent]
+        placed[np.arange(len(parent))[:, None], ys, xs] = True
+    return parent, cand, xs, ys, placed
+
+
+def feature_matrix(boards, heights, parent, xs, ys):
+    """
+    Heuristic feature matrix for a batch of placements.
+
+    Features are derived from per-board summaries of the source stack
+    plus the four piece cells, so no (K, rows, cols) pass is needed.
+
+    Args:
+        boards: (n, rows, cols) source boards (piece not locked)
+        heights: (n, cols) column_heights(boards)
+        parent: (K,) source board of each placement
+        xs, ys: (K, 4) block cells of the piece
+
+    Returns:
+        (K, 10) float matrix in weight order.
+    """
+    n, rows, cols = boards.shape
+    k = len(parent)
+    ar = np.arange(k)
+    features = np.empty((k, _N_FEATURES), dtype=np.float64)
+
+    src_fill = np.count_nonzero(boards, axis=2)
+    row_fill = src_fill[parent]
+    h = heights[parent]
+    for i in range(4):
+        row_fill[ar, ys[:, i]] += 1
+        col = xs[:, i]
+        h[ar, col] = np.maximum(h[ar, col], rows - ys[:, i])
+
+    agg_height = h.sum(axis=1)
+    cells = src_fill.sum(axis=1)[parent] + 4
+    lines = (row_fill == cols).sum(axis=1) - (src_fill == cols).sum(axis=1)[parent]
+
+    # Blockades count every cell with any empty cell above it, so only a
+    # solid run from row 0 down is excluded. That needs row 0 occupied,
+    # which is rare enough to handle on the few boards where it happens.
+    solid = np.zeros(k, dtype=np.int64)
+    topped = boards[:, 0, :].any(axis=1)[parent] | (ys == 0).any(axis=1)
+    if topped.any():
+        idx = np.nonzero(topped)[0]
+        sub = boards[parent[idx]]
+        sub[np.arange(len(idx))[:, None], ys[idx], xs[idx]] = True
+        solid[idx] = np.logical_and.accumulate(sub, axis=1).sum(axis=(1, 2))
+
+    padded = np.pad(h, ((0, 0), (1, 1)), constant_values=rows)
+    well_depth = np.minimum(padded[:, :-2], padded[:, 2:]) - h
+    well_col = well_depth.argmax(axis=1)
+    has_well = well_depth[ar, well_col] > 0
+
+    below = np.minimum(ys + 1, rows - 1)
+    supported = (ys >= rows - 1) | boards[parent[:, None], below, xs]
+    fills_well = has_well & ((xs == well_col[:, None]) & supported).any(axis=1)
+
+    features[:, 0] = agg_height
+    features[:, 1] = agg_height - cells
+    features[:, 2] = cells - solid
+    features[:, 3] = np.abs(np.diff(h, axis=1)).sum(axis=1)
+    features[:, 4] = ((row_fill >= cols - 2) & (row_fill < cols)).sum(axis=1)
+    features[:, 5] = fills_well
+    features[:, 6] = lines == 4
+    features[:, 7] = lines == 3
+    features[:, 8] = lines == 2
+    features[:, 9] = lines == 1
+    features[:, 4:] *= -1      # Rewards reduce cost
+    return features
+
+
+def weighted_cost(features, w):
+    """
+    Row-wise features . w, added left to right like _combine_cost().
+    w is a (10,) vector or a (K, 10) matrix aligned with features.
+    """
+    terms = features * w
+    cost = terms[:, 0].copy()
+    for f in range(1, _N_FEATURES):
+        cost += terms[:, f]
+    return cost
+
+
+def clear_full_rows(boards):
+    """Remove full rows from every board in the stack (returns a new array)."""
+    n, rows, cols = boards.shape
+    full = np.count_nonzero(boards, axis=2) == cols
+    if not full.any():
+        return boards
+    # Stable sort moves full rows to the top, then they are blanked.
+    order = np.argsort(~full, axis=1, kind='stable')
+    cleared = np.take_along_axis(boards, order[:, :, None], axis=1)
+    cleared[np.arange(rows)[None, :] < full.sum(axis=1)[:, None]] = False
+    return cleared
+
+
+def score_placements(grid, shape, weights):
+    """
+    Score every placement of shape on grid in one call.
+
+    Returns:
+        (placements, scores): list of (rot, x, drop_y) and a score vector
+        (-cost) aligned with it.
+    """
+    w = np.asarray(weights[:_N_FEATURES], dtype=np.float64)
+    boards = occupancy(grid)[None]
+    heights = column_heights(boards)
+    parent, cand, xs, ys, _ = expand(boards, shape, heights, build=False)
+    scores = -weighted_cost(feature_matrix(boards, heights, parent, xs, ys), w)
+
+    table = PLACEMENT_TABLES[shape]
+    drop_y = ys[:, 0] - table['dy'][cand, 0]
+    placements = list(zip(table['rot'][cand].tolist(), table['x'][cand].tolist(),
+                          drop_y.tolist()))
+    return placements, scores
+
+
+def find_best_move_batch(grid, shape, next_shape, weights):
+    """
+    Vectorized find_best_move_scored(): both plies of the 1-step
+    lookahead are scored with one feature matrix each.
+
+    Returns:
+        (best_rot, best_x, best_score) or None
+    """
+    w = np.asarray(weights[:_N_FEATURES], dtype=np.float64)
+    boards = occupancy(grid)[None]
+    heights = column_heights(boards)
+    parent, cand, xs, ys, placed = expand(boards, shape, heights,
+                                          build=bool(next_shape))
+    if len(cand) == 0:
+        return None
+
+    scores = -weighted_cost(feature_matrix(boards, heights, parent, xs, ys), w)
+
+    if next_shape:
+        after = clear_full_rows(placed)
+        after_heights = column_heights(after)
+        parent2, _, xs2, ys2, _ = expand(after, next_shape, after_heights,
+                                         build=False)
+        next_best = np.full(len(cand), -np.inf)
+        if len(parent2):
+            scores2 = -weighted_cost(feature_matrix(after, after_heights, parent2, xs2, ys2), w)
+            np.maximum.at(next_best, parent2, scores2)
+        scores = scores + next_best
+
+    best = int(np.argmax(scores))
+    if scores[best] == -np.inf:
+        return None
+
+    table = PLACEMENT_TABLES[shape]
+    return (int(table['rot'][cand[best]]), int(table['x'][cand[best]]),
+            float(scores[best]))
+
+
+def find_best_move_with_hold_batch(grid, shape, next_shape, held_piece, is_held,
+                                   weights):
+    """
+    Vectorized evaluator.find_best_move_with_hold_scored(): the play and
+    hold branches are two boards of one best_moves() call, and play wins
+    ties as in the scalar search.
+
+    Returns:
+        (best_rot, best_x, should_hold, best_score) or None
+    """
+    shapes, nexts = [shape], [next_shape]
+    if not is_held:
+        if held_piece is not None:
+            shapes.append(held_piece)    # Swap: play held_piece, lookahead next_shape
+            nexts.append(next_shape)
+        else:
+            shapes.append(next_shape)    # First hold ever: no lookahead piece known
+            nexts.append(None)
+    n = len(shapes)
+    w = np.asarray(weights[:_N_FEATURES], dtype=np.float64)
+    rot, x, _, score = best_moves(
+        np.repeat(occupancy(grid)[None], n, axis=0),
+        np.array([SHAPE_INDEX[s] for s in shapes]),
+        np.array([SHAPE_INDEX[s] if s else -1 for s in nexts]),
+        np.tile(w, (n, 1)),
+    )
+    if n == 1 or score[0] >= score[1]:
+        if rot[0] < 0:
+            return None
+        return (int(rot[0]), int(x[0]), False, float(score[0]))
+    return (int(rot[1]), int(x[1]), True, float(score[1]))
+
+
+def best_moves(boards, shape_idx, next_idx, weights):
+    """
+    Best 1-step-lookahead placement for every board in a stack, where
+    each board has its own piece, lookahead piece and weight vector.
+
+    Args:
+        boards: (n, rows, cols) boolean array
+        shape_idx: (n,) SHAPE_INDEX of the piece to place
+        next_idx: (n,) SHAPE_INDEX of the lookahead piece, -1 for none
+        weights: (n, 10) per-board weights
+
+    Returns:
+        (rot, x, drop_y, score) arrays of shape (n,); score is -inf and
+        rot/x/drop_y are -1 where a board has no valid placement.
+    """
+    n = boards.shape[0]
+    heights = column_heights(boards)
+    parent, cand, xs, ys, placed = expand(boards, shape_idx, heights)
+
+    w = weights[:, :_N_FEATURES]
+    scores = -weighted_cost(feature_matrix(boards, heights, parent, xs, ys), w[parent])
+
+    has_next = next_idx[parent] >= 0
+    if has_next.any():
+        sel = np.nonzero(has_next)[0]
+        after = clear_full_rows(placed[sel])
+        after_heights = column_heights(after)
+        parent2, _, xs2, ys2, _ = expand(after, next_idx[parent[sel]], after_heights,
+                                         build=False)
+        next_best = np.full(len(sel), -np.inf)
+        if len(parent2):
+            scores2 = -weighted_cost(
+                feature_matrix(after, after_heights, parent2, xs2, ys2),
+                w[parent[sel[parent2]]],
+            )
+            np.maximum.at(next_best, parent2, scores2)
+        scores[sel] += next_best
+
+    rot = np.full(n, -1, dtype=np.int64)
+    x = np.full(n, -1, dtype=np.int64)
+    drop_y = np.full(n, -1, dtype=np.int64)
+    best = np.full(n, -np.inf)
+    if len(parent):
+        # Per-board argmax; ties keep the first candidate, like the scalar search.
+        order = np.lexsort((np.arange(len(parent)), -scores, parent))
+        first = order[np.r_[True, parent[order][1:] != parent[order][:-1]]]
+        first = first[np.isfinite(scores[first])]
+        b = parent[first]
+        rot[b] = MIXED_TABLE['rot'][cand[first]]
+        x[b] = MIXED_TABLE['x'][cand[first]]
+        drop_y[b] = ys[first, 0] - MIXED_TABLE['dy'][cand[first], 0]
+        best[b] = scores[first]
+    return rot, x, drop_y, best
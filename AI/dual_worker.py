@@ -0,0 +1,297 @@
+"""
+Dual-Worker Client — Request, Reply and Speculation Plumbing for TetrisAI
+
+DualWorkerMixin is the async half shared by AI/TetrisAI.py and
+AI/GA/tetris_ai.py: it sends each piece's PLAY and HOLD requests to the
+workers (worker.py, or a worker_pool.py endpoint), collects the replies,
+picks the better branch, and speculates on the next piece while the
+current one is being moved.
+
+The host class provides game, delay, last_action_time, search_mode,
+beam_width and time_limit, calls _init_workers() from __init__ and
+_update_dual_async() from update() when it has a play pipe.
+"""
+
+import os
+import sys
+import time
+
+from Tetris.settings import TETROMINOS
+from Tetris.core import BitboardCore
+
+# Ensure AI/ is on the path for evaluator imports.
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from evaluator import SEARCH_ANYTIME, SEARCH_EXPECTIMAX, SEARCH_LOOKAHEAD
+
+
+class DualWorkerMixin:
+    """Async dual-worker mode of a TetrisAI (see the module docstring)."""
+
+    def _init_workers(self, play_pipe, hold_pipe):
+        # ---- Dual-worker pipes (Phase 7) ----
+        self._play_pipe = play_pipe      # Worker A: play current
+        self._hold_pipe = hold_pipe      # Worker B: hold & play held
+        self._piece_id_counter = 0
+        self._pending_piece_id = None
+        self._pending_owed = 0           # Replies still owed for _pending_piece_id
+        self._last_sent_piece_id = None
+
+        # Speculative request for the next piece: [id, requests, play, hold, owed]
+        self._speculation = None
+        self._speculated_piece_id = None
+
+        # Store results from each worker
+        self._play_result = None         # (rot, x, score) from Worker A
+        self._hold_result = None         # (rot, x, score) from Worker B
+
+    @property
+    def waiting(self):
+        """True while the workers owe a reply (either branch) for the current piece."""
+        return (self._play_pipe is not None and self._pending_piece_id is not None
+                and self._pending_owed > 0)
+
+    def wait_for_reply(self, timeout):
+        """
+        Block up to timeout seconds until a worker reply is ready for the
+        next update() (SimClock.hold()). False if none came in time.
+        """
+        pipes = [pipe for pipe in (self._play_pipe, self._hold_pipe) if pipe is not None]
+        deadline = time.monotonic() + timeout
+        while True:
+            for pipe in pipes:
+                if pipe.poll(min(max(deadline - time.monotonic(), 0), 0.001)):
+                    return True
+            if time.monotonic() >= deadline:
+                return False
+
+    def reset(self):
+        """
+        Forget the cached move and any in-flight worker requests, e.g.
+        after Main.restore() replaced the board and the active piece.
+        """
+        if self._play_pipe is not None and self._piece_id_counter:
+            self._cancel_requests(self._piece_id_counter)    # Every id sent so far
+        self._cached_move = None
+        self._cached_piece_id = None
+        self._pending_piece_id = None
+        self._pending_owed = 0
+        self._last_sent_piece_id = None
+        self._speculation = None
+        self._speculated_piece_id = None
+        self._play_result = None
+        self._hold_result = None
+
+    def _update_dual_async(self, tetromino, shape, current_rot, current_px,
+                           piece_id, next_shape,
+                           held_piece, is_held, now, next_shapes=None,
+                           bag=None):
+        """
+        Dual-worker async: send current board to BOTH workers simultaneously.
+        Worker A evaluates "play current piece" with 1-step lookahead.
+        Worker B evaluates "hold & play held piece" with 1-step lookahead.
+        Main process picks whichever branch scores higher.
+        """
+
+        # ---- Send to both workers when piece changes ----
+        if piece_id != self._last_sent_piece_id:
+            self._last_sent_piece_id = piece_id
+            self._speculated_piece_id = None
+            self._cached_move = None
+            self._play_result = None
+            self._hold_result = None
+
+            # Whole board packed into one 200-bit int (BitboardCore.pack)
+            board_key = BitboardCore.pack(self.game.board)
+            requests = self._worker_requests(
+                board_key, shape, next_shape, held_piece, is_held, next_shapes, bag
+            )
+
+            spec, self._speculation = self._speculation, None
+            if spec is not None and spec[1] == requests:
+                # Predicted board was right — adopt the speculative replies
+                self._pending_piece_id = spec[0]
+                self._play_result, self._hold_result = spec[2], spec[3]
+                self._pending_owed = spec[4]
+            else:
+                if spec is not None:
+                    self._cancel_requests(spec[0])    # Wrong guess — stop its search
+                self._piece_id_counter += 1
+                self._pending_piece_id = self._piece_id_counter
+                self._pending_owed = self._send_requests(self._piece_id_counter, requests)
+
+        # ---- Poll Worker A (play) ----
+        while self._play_pipe.poll():
+            recv_id, rot, x, score = self._play_pipe.recv()
+            result = (rot, x, score) if rot is not None else None
+            if recv_id == self._pending_piece_id:
+                self._play_result = result
+                self._pending_owed -= 1
+            elif self._speculation and recv_id == self._speculation[0]:
+                self._speculation[2] = result
+                self._speculation[4] -= 1
+
+        # ---- Poll Worker B (hold) ----
+        if self._hold_pipe is not None:
+            while self._hold_pipe.poll():
+                recv_id, rot, x, score = self._hold_pipe.recv()
+                result = (rot, x, score) if rot is not None else None
+                if recv_id == self._pending_piece_id:
+                    self._hold_result = result
+                    self._pending_owed -= 1
+                elif self._speculation and recv_id == self._speculation[0]:
+                    self._speculation[3] = result
+                    self._speculation[4] -= 1
+
+        # ---- Decide: play or hold? ----
+        # Wait for both branches, so the choice never depends on which
+        # worker happened to answer first
+        if self.waiting:
+            return
+
+        play_score = self._play_result[2] if self._play_result else float("-inf")
+        hold_score = self._hold_result[2] if self._hold_result else float("-inf")
+
+        if hold_score > play_score and self._hold_result is not None:
+            # Hold is better — swap and re-evaluate will happen next frame
+            best_rot, best_x = self._hold_result[0], self._hold_result[1]
+            self._cached_move = (best_rot, best_x, True)    # should_hold = True
+        elif self._play_result is not None:
+            best_rot, best_x = self._play_result[0], self._play_result[1]
+            self._cached_move = (best_rot, best_x, False)   # should_hold = False
+        else:
+            return
+
+        # ---- Execute ----
+        best_rot, best_x, should_hold = self._cached_move
+
+        if should_hold:
+            self.game.hold_piece()
+            self._cached_piece_id = None     # Force re-evaluation after hold
+            self._cached_move = None
+            self._play_result = None
+            self._hold_result = None
+            return
+
+        # ---- Speculate: next piece on the predicted post-lock board ----
+        if self._speculated_piece_id != piece_id:
+            self._speculated_piece_id = piece_id
+            self._speculate(shape, best_rot, best_x, held_piece, next_shapes)
+
+        rot_needed = (best_rot - current_rot) % 4
+        dx_needed = best_x - current_px
+
+        # Only delay the hard drop (same as before)
+        if rot_needed == 0 and dx_needed == 0:
+            if now - self.last_action_time < self.delay:
+                return
+
+        self._execute_move(tetromino, best_rot, best_x, current_rot, current_px, now)
+
+    def _worker_requests(self, board_key, shape, next_shape, held_piece, is_held,
+                         next_shapes=None, bag=None):
+        """
+        Request bodies (without piece id) for the PLAY and HOLD workers.
+
+        Returns:
+            (play_request, hold_request or None)
+        """
+        # Beam / expectimax / anytime modes: each worker also gets
+        # (queue, held, depth, width[, bag, time_limit]) — its piece queue
+        # starting with the piece it places first, and the held piece
+        # after that placement. Same depth for both.
+        preview = None
+        if self.search_mode != SEARCH_LOOKAHEAD and next_shapes:
+            preview = tuple(next_shapes)
+        play_beam = hold_beam = None
+        if preview:
+            depth = len(preview)
+            extra = ()
+            if self.search_mode == SEARCH_EXPECTIMAX:
+                extra = (tuple(bag or ()), self.time_limit)
+            elif self.search_mode == SEARCH_ANYTIME:
+                extra = (None, self.time_limit)    # No bag: deadline-bounded beam
+            play_beam = ((shape,) + preview, held_piece, depth, self.beam_width) + extra
+            if held_piece is not None:
+                hold_beam = ((held_piece,) + preview, shape, depth, self.beam_width) + extra
+            else:
+                hold_beam = (preview, shape, depth, self.beam_width) + extra
+
+        # Worker A: play the CURRENT piece
+        play_request = (board_key, shape, next_shape, play_beam)
+
+        # Worker B: hold and play the HELD piece (only if hold is available)
+        hold_request = None
+        if not is_held and self._hold_pipe is not None:
+            if held_piece is not None:
+                # Swap: play held_piece, lookahead with next_shape
+                hold_request = (board_key, held_piece, next_shape, hold_beam)
+            else:
+                # First hold ever: play next_shape, no lookahead piece known
+                hold_request = (board_key, next_shape, None, hold_beam)
+        return play_request, hold_request
+
+    def _send_requests(self, request_id, requests):
+        """Send both branches' requests; returns the number of replies owed."""
+        play_request, hold_request = requests
+        self._play_pipe.send((request_id,) + play_request)
+        if hold_request is None:
+            return 1
+        self._hold_pipe.send((request_id,) + hold_request)
+        return 2
+
+    def _cancel_requests(self, request_id):
+        self._play_pipe.send(('cancel', request_id))
+        if self._hold_pipe is not None:
+            self._hold_pipe.send(('cancel', request_id))
+
+    def _speculate(self, shape, best_rot, best_x, held_piece, next_shapes):
+        """
+        Send the next piece's requests for the board this move will leave,
+        so the search runs while the current piece is still being moved.
+        The replies are used only if the real board and pieces match.
+
+        Only the 1-step lookahead can be predicted: beam / expectimax
+        requests include a preview piece that has not been drawn yet.
+        """
+        if self.search_mode != SEARCH_LOOKAHEAD or not next_shapes or len(next_shapes) < 2:
+            return
+        board = list(self.game.board)
+        blocks = TETROMINOS[shape]['rotations'][best_rot]
+        drop_y = BitboardCore.hard_drop_y_fast(board, blocks, best_x, -1)
+        BitboardCore.lock_piece_mut(board, blocks, best_x, drop_y)
+        BitboardCore.clear_lines_mut(board)
+
+        requests = self._worker_requests(
+            BitboardCore.pack(board), next_shapes[0], next_shapes[1],
+            held_piece, False
+        )
+        self._piece_id_counter += 1
+        self._speculation = [self._piece_id_counter, requests, None, None, 0]
+        self._speculation[4] = self._send_requests(self._piece_id_counter, requests)
+
+    def _execute_move(self, tetromino, best_rot, best_x, current_rot, current_px, now):
+        """Execute a computed move on the real tetromino."""
+        rotations_needed = (best_rot - current_rot) % 4
+        dx_needed = best_x - current_px
+
+        for _ in range(rotations_needed):
+            tetromino.rotate()
+
+        if dx_needed > 0:
+            for _ in range(dx_needed):
+                tetromino.move_horizontal(+1)
+        elif dx_needed < 0:
+            for _ in range(-dx_needed):
+                tetromino.move_horizontal(-1)
+
+        if rotations_needed == 0 and dx_needed == 0:
+            if hasattr(self.game, 'perform_hard_drop'):
+                self.game.perform_hard_drop()
+            elif hasattr(tetromino, 'hard_drop'):
+                tetromino.hard_drop()
+            else:
+                while tetromino.move_down():
+                    pass
+
+        self.last_action_time = now
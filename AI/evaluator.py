@@ -8,19 +8,59 @@ AI/GA/tetris_ai.py (GA variant).
 NO PYGAME IMPORTS ALLOWED IN THIS FILE.
 """
 
+import heapq
 import os
 import sys
+import time
+from operator import itemgetter
 
 # Ensure Tetris/ is importable (for settings and core)
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "Tetris")))
 
 from Tetris.settings import COLUMNS, ROWS, TETROMINOS
-from Tetris.core import TetrisCore
+from Tetris.core import BitboardCore, BoardState
+from AI.batch_evaluator import find_best_move_with_hold_batch
 
 # Module-level constants
 _SPAWN_Y = -1
 _SPAWN_X = (COLUMNS // 2) - 1
 
+# Transposition table: (packed board, shape, weights) -> best next-piece
+# score. Shared by every search in the process; cleared when full.
+TRANSPOSITION_SIZE = 1 << 16
+_transpositions = {}
+
+
+# Chance nodes: (packed board, remaining bag, weights) -> expected score.
+_chance_table = {}
+
+# Beam search: boards kept per ply.
+BEAM_WIDTH = 6
+
+# Expectimax: seconds allowed for one whole search (beam and chance layer).
+EXPECTIMAX_TIME_LIMIT = 0.05
+
+# Anytime search: seconds allowed per piece.
+ANYTIME_TIME_LIMIT = 0.02
+
+# Search modes selectable by TetrisAI, HeadlessGame and the workers.
+SEARCH_LOOKAHEAD = 'lookahead'     # Hold-aware 1-step lookahead
+SEARCH_BEAM = 'beam'               # beam_search() over the preview
+SEARCH_EXPECTIMAX = 'expectimax'   # expectimax_search(): beam + 7-bag chance layer
+SEARCH_ANYTIME = 'anytime'         # anytime_search(): beam deepened until a deadline
+SEARCH_MODES = (SEARCH_LOOKAHEAD, SEARCH_BEAM, SEARCH_EXPECTIMAX, SEARCH_ANYTIME)
+
+
+def clear_transpositions():
+    """Drop every cached next-piece and chance-node score."""
+    _transpositions.clear()
+    _chance_table.clear()
+
+
+def _placements(state, shape):
+    """All straight-drop placements for shape, served from the surface cache."""
+    return BitboardCore.placements_for_heights(tuple(state.heights), shape, _SPAWN_Y)
+
 
 def compute_board_features(board, virtual_set):
     """
@@ -131,8 +171,6 @@ def cost_function(board, virtual_coords, virtual_set, lines_cleared, weights):
     [agg_height, holes, blockades, bumpiness, almost_full,
     fills_well, clear_4, clear_3, clear_2, clear_1]
     """
-    w = weights
-
     (
         agg_height,
         holes,
@@ -152,6 +190,15 @@ def cost_function(board, virtual_coords, virtual_set, lines_cleared, weights):
                     fills_well = True
                     break
 
+    return _combine_cost(agg_height, holes, blockades, bumpiness, almost_full,
+                         fills_well, lines_cleared, weights)
+
+
+def _combine_cost(agg_height, holes, blockades, bumpiness, almost_full,
+                  fills_well, lines_cleared, weights):
+    """Weighted sum shared by cost_function() and state_cost()."""
+    w = weights
+
     if lines_cleared == 4:
         clear_bonus = w[6]
     elif lines_cleared == 3:
@@ -177,34 +224,98 @@ def cost_function(board, virtual_coords, virtual_set, lines_cleared, weights):
     return cost
 
 
-def evaluate_next(grid, shape, weights):
-    """Evaluate best score for next piece (no further lookahead)."""
-    placements = TetrisCore.evaluate_all_placements(grid, shape, _SPAWN_Y, COLUMNS, ROWS)
-    if not placements:
-        return float("-inf")
+def state_cost(state, piece_cells, lines_cleared, weights):
+    """
+    cost_function() for a BoardState that already has the piece pushed.
+
+    piece_cells are the (x, y) cells of that piece; they are excluded
+    when checking what supports a well-filling block, exactly as the
+    virtual-cell version sees the board before the lock.
+    """
+    (
+        agg_height,
+        holes,
+        blockades,
+        bumpiness,
+        almost_full,
+        well_col,
+        well_depth,
+        heights,
+    ) = state.features()
+
+    fills_well = False
+    if well_col != -1:
+        board = state.board
+        bit = 1 << well_col
+        for vx, vy in piece_cells:
+            if vx == well_col:
+                if vy >= ROWS - 1 or (
+                    vy + 1 < ROWS and board[vy + 1] & bit
+                    and (vx, vy + 1) not in piece_cells
+                ):
+                    fills_well = True
+                    break
+
+    return _combine_cost(agg_height, holes, blockades, bumpiness, almost_full,
+                         fills_well, lines_cleared, weights)
+
+
+def _evaluate_next_state(state, shape, weights, weights_key=None):
+    """
+    evaluate_next() on a BoardState: lock -> score -> undo per placement.
+    Results are memoized in the transposition table.
+    """
+    if weights_key is None:
+        weights_key = tuple(weights)
+    key = (state.key(), shape, weights_key)
+    cached = _transpositions.get(key)
+    if cached is not None:
+        return cached
 
     best_score = float("-inf")
 
-    for rot, x, drop_y, blocks in placements:
-        virtual_coords = [(x + bx, drop_y + by) for bx, by in blocks]
-        virtual_set = frozenset(virtual_coords)
-        lines_cleared = count_cleared_lines(grid, blocks, x, drop_y)
-        score = -cost_function(grid, virtual_coords, virtual_set, lines_cleared, weights)
+    for rot, x, drop_y, blocks in _placements(state, shape):
+        cells = [(x + bx, drop_y + by) for bx, by in blocks]
+        lines_cleared = state.push(blocks, x, drop_y)
+        score = -state_cost(state, cells, lines_cleared, weights)
+        state.pop()
         if score > best_score:
             best_score = score
 
+    if len(_transpositions) >= TRANSPOSITION_SIZE:
+        _transpositions.clear()
+    _transpositions[key] = best_score
     return best_score
 
 
-def find_best_move(grid, shape, next_shape, weights):
-    """
-    Find the best (rot, x) placement for the given shape on the grid.
-    1-step lookahead.
+def evaluate_next(grid, shape, weights):
+    """Evaluate best score for next piece (no further lookahead)."""
+    return _evaluate_next_state(BoardState.from_grid(grid), shape, weights)
 
-    Returns:
-        (best_rot, best_x), or None if no valid placement exists.
+
+def _score_state(state, cells, blocks, x, drop_y, next_shape, weights,
+                 weights_key=None):
     """
-    placements = TetrisCore.evaluate_all_placements(grid, shape, _SPAWN_Y, COLUMNS, ROWS)
+    Total score of one placement with 1-step lookahead.
+    The state is left exactly as it was passed in.
+    """
+    lines_cleared = state.push(blocks, x, drop_y)
+    cost_now = state_cost(state, cells, lines_cleared, weights)
+
+    if next_shape:
+        state.clear_lines()
+        next_score = _evaluate_next_state(state, next_shape, weights, weights_key)
+        total_score = -cost_now + next_score
+    else:
+        total_score = -cost_now
+
+    state.pop()
+    return total_score
+
+
+def _search_state(state, shape, next_shape, weights, weights_key):
+    """1-step lookahead search on a BoardState. Returns (rot, x, score) or None."""
+    placements = _placements(state, shape)
     if not placements:
         return None
 
@@ -213,18 +324,9 @@ def find_best_move(grid, shape, next_shape, weights):
     best_x = _SPAWN_X
 
     for rot, x, drop_y, blocks in placements:
-        virtual_coords = [(x + bx, drop_y + by) for bx, by in blocks]
-        virtual_set = frozenset(virtual_coords)
-        lines_cleared = count_cleared_lines(grid, blocks, x, drop_y)
-        cost_now = cost_function(grid, virtual_coords, virtual_set, lines_cleared, weights)
-
-        if next_shape:
-            locked_grid = TetrisCore.lock_piece(grid, shape, rot, x, drop_y)
-            cleared_grid, _ = TetrisCore.clear_lines(locked_grid)
-            next_score = evaluate_next(cleared_grid, next_shape, weights)
-            total_score = -cost_now + next_score
-        else:
-            total_score = -cost_now
+        cells = [(x + bx, drop_y + by) for bx, by in blocks]
+        total_score = _score_state(state, cells, blocks, x, drop_y,
+                                   next_shape, weights, weights_key)
 
         if total_score > best_score:
             best_score = total_score
@@ -234,83 +336,55 @@ def find_best_move(grid, shape, next_shape, weights):
     if best_score == float("-inf"):
         return None
 
-    return best_rot, best_x
+    return (best_rot, best_x, best_score)
 
 
-def find_best_move_scored(grid, shape, next_shape, weights):
+def _search(grid, shape, next_shape, weights):
+    """Shared 1-step lookahead search. Returns (rot, x, score) or None."""
+    return _search_state(BoardState.from_grid(grid), shape, next_shape,
+                         weights, tuple(weights))
+
+
+def find_best_move(grid, shape, next_shape, weights):
     """
-    Same as find_best_move but also returns the total score.
-    Used by dual-worker system to compare play vs hold branch.
+    Find the best (rot, x) placement for the given shape on the grid.
+    1-step lookahead.
 
     Returns:
-        (best_rot, best_x, best_score) or None
+        (best_rot, best_x), or None if no valid placement exists.
     """
-    placements = TetrisCore.evaluate_all_placements(grid, shape, _SPAWN_Y, COLUMNS, ROWS)
-    if not placements:
+    result = _search(grid, shape, next_shape, weights)
+    if result is None:
         return None
+    return result[0], result[1]
 
-    best_score = float("-inf")
-    best_rot = 0
-    best_x = _SPAWN_X
-
-    for rot, x, drop_y, blocks in placements:
-        virtual_coords = [(x + bx, drop_y + by) for bx, by in blocks]
-        virtual_set = frozenset(virtual_coords)
-        lines_cleared = count_cleared_lines(grid, blocks, x, drop_y)
-        cost_now = cost_function(grid, virtual_coords, virtual_set, lines_cleared, weights)
-
-        if next_shape:
-            locked_grid = TetrisCore.lock_piece(grid, shape, rot, x, drop_y)
-            cleared_grid, _ = TetrisCore.clear_lines(locked_grid)
-            next_score = evaluate_next(cleared_grid, next_shape, weights)
-            total_score = -cost_now + next_score
-        else:
-            total_score = -cost_now
 
-        if total_score > best_score:
-            best_score = total_score
-            best_rot = rot
-            best_x = x
-
-    if best_score == float("-inf"):
-        return None
+def find_best_move_scored(grid, shape, next_shape, weights):
+    """
+    Same as find_best_move but also returns the total score.
+    Used by dual-worker system to compare play vs hold branch.
 
-    return (best_rot, best_x, best_score)
+    Returns:
+        (best_rot, best_x, best_score) or None
+    """
+    return _search(grid, shape, next_shape, weights)
 
 
 
 # ---------------------------------------------------------------------------
-# Hold-aware search (uses _score_placement for branch comparison)
+# Hold-aware search (both branches in one pass over a shared BoardState)
 # ---------------------------------------------------------------------------
 
-def _score_placement(grid, shape, next_shape, rot, x, weights):
-    """Score a specific (rot, x) placement for comparison."""
-    rotations = TETROMINOS[shape]['rotations']
-    blocks = rotations[rot]
-    drop_y = TetrisCore.hard_drop_y_fast(grid, blocks, x, _SPAWN_Y, COLUMNS, ROWS)
-
-    virtual_coords = [(x + bx, drop_y + by) for bx, by in blocks]
-    virtual_set = frozenset(virtual_coords)
-    lines_cleared = count_cleared_lines(grid, blocks, x, drop_y)
-    cost_now = cost_function(grid, virtual_coords, virtual_set,
-                             lines_cleared, weights)
-
-    if next_shape:
-        locked_grid = TetrisCore.lock_piece(grid, shape, rot, x, drop_y)
-        cleared_grid, _ = TetrisCore.clear_lines(locked_grid)
-        next_score = evaluate_next(cleared_grid, next_shape, weights)
-        return -cost_now + next_score
-    else:
-        return -cost_now
-
-
-def find_best_move_with_hold(grid, shape, next_shape, held_piece, is_held,
-                              weights):
+def find_best_move_with_hold_scored(grid, shape, next_shape, held_piece,
+                                    is_held, weights):
     """
     Find the best move considering both branches:
       A) Play the current piece as-is
       B) Hold current piece and play held_piece (or next_shape if no held piece)
 
+    The grid is packed once and both searches run on the same BoardState;
+    each branch's best score comes straight out of its search.
+
     Args:
         grid: 2D integer grid
         shape: Current piece key ('T', 'I', etc.)
@@ -320,20 +394,19 @@ def find_best_move_with_hold(grid, shape, next_shape, held_piece, is_held,
         weights: list of 10+ floats
 
     Returns:
-        (best_rot, best_x, should_hold) or None
+        (best_rot, best_x, should_hold, best_score) or None
     """
+    state = BoardState.from_grid(grid)
+    weights_key = tuple(weights)
+
     # ---- Branch A: Play current piece normally ----
-    result_a = find_best_move(grid, shape, next_shape, weights)
-    if result_a is not None:
-        rot_a, x_a = result_a
-        score_a = _score_placement(grid, shape, next_shape, rot_a, x_a, weights)
-    else:
-        score_a = float("-inf")
+    result_a = _search_state(state, shape, next_shape, weights, weights_key)
+    score_a = result_a[2] if result_a is not None else float("-inf")
 
     # ---- Branch B: Hold + play held piece ----
     # Only consider hold if we haven't already held this turn
-    score_b = float("-inf")
     result_b = None
+    score_b = float("-inf")
     if not is_held:
         if held_piece is not None:
             # Swap: play held_piece, next lookahead = next_shape
@@ -344,18 +417,273 @@ def find_best_move_with_hold(grid, shape, next_shape, held_piece, is_held,
             play_piece = next_shape
             lookahead_piece = None
 
-        result_b = find_best_move(grid, play_piece, lookahead_piece, weights)
+        result_b = _search_state(state, play_piece, lookahead_piece,
+                                 weights, weights_key)
         if result_b is not None:
-            rot_b, x_b = result_b
-            score_b = _score_placement(grid, play_piece, lookahead_piece,
-                                       rot_b, x_b, weights)
+            score_b = result_b[2]
 
     # ---- Pick the better branch ----
     if score_a >= score_b:
         if result_a is None:
             return None
-        return (result_a[0], result_a[1], False)    # Play current, don't hold
+        return (result_a[0], result_a[1], False, score_a)    # Play current, don't hold
     else:
-        if result_b is None:
+        return (result_b[0], result_b[1], True, score_b)     # Hold, then play
+
+
+def find_best_move_with_hold(grid, shape, next_shape, held_piece, is_held,
+                              weights):
+    """
+    find_best_move_with_hold_scored() without the score.
+
+    Returns:
+        (best_rot, best_x, should_hold) or None
+    """
+    result = find_best_move_with_hold_scored(grid, shape, next_shape,
+                                             held_piece, is_held, weights)
+    if result is None:
+        return None
+    return result[:3]
+
+
+# ---------------------------------------------------------------------------
+# Beam search over the preview queue
+# ---------------------------------------------------------------------------
+
+def _beam_options(queue, held, qi, can_hold):
+    """(piece, held_after, next_qi, is_hold) choices for one ply."""
+    if qi >= len(queue):
+        return []
+    current = queue[qi]
+    options = [(current, held, qi + 1, False)]
+    if can_hold:
+        if held is not None:
+            if held != current:
+                options.append((held, current, qi + 1, True))
+        elif qi + 1 < len(queue):
+            options.append((queue[qi + 1], current, qi + 2, True))
+    return options
+
+
+def beam_search(grid, queue, held_piece, can_hold, weights,
+                beam_width=BEAM_WIDTH, depth=None):
+    """
+    Multi-piece lookahead over a known piece queue with hold.
+
+    Every ply places one piece (the next queued piece, or the held one
+    after a hold) on each board in the beam, scores the child by its
+    cumulative -cost_function(), and keeps the beam_width best distinct
+    boards. Work grows linearly with depth instead of exponentially.
+
+    Args:
+        grid: 2D integer grid
+        queue: Pieces in arrival order, starting with the current piece
+        held_piece: Currently held piece key (str or None)
+        can_hold: False if hold was already used for the current piece
+        weights: list of 10+ floats
+        beam_width: Boards kept after each ply
+        depth: Pieces to place; defaults to len(queue) - 1 so that a
+            first hold (which consumes a queued piece) still reaches it
+
+    Returns:
+        (best_rot, best_x, should_hold, best_score) for the first piece,
+        or None if no valid placement exists.
+    """
+    queue = tuple(queue)
+    if depth is None:
+        depth = max(1, len(queue) - 1)
+
+    best = _beam(grid, queue, held_piece, can_hold, weights, beam_width, depth)[0]
+    if best[4] is None:
+        return None
+    rot, x, should_hold = best[4]
+    return (rot, x, should_hold, best[0])
+
+
+def _beam(grid, queue, held_piece, can_hold, weights, beam_width, depth,
+          deadline=None):
+    """
+    Run the beam plies.
+
+    With a deadline (time.perf_counter() value), plies after the first
+    stop as soon as it passes and the last complete beam is returned.
+    Parents are expanded best first, so the boards most likely to win
+    are searched before the clock runs out.
+
+    Returns:
+        Final beam, best first: [(score, board, held, queue_index, first_move)]
+        where first_move is (rot, x, is_hold), or None if nothing was placed.
+    """
+    beam = [(0.0, BitboardCore.from_grid(grid), held_piece, 0, None)]
+
+    for ply in range(depth):
+        hold_ok = can_hold or ply > 0
+        children = {}
+        for score, board, held, qi, first in beam:
+            state = BoardState(board)
+            for piece, next_held, next_qi, is_hold in _beam_options(queue, held, qi, hold_ok):
+                if ply and deadline is not None and time.perf_counter() >= deadline:
+                    return beam    # Out of time: keep the last full ply
+                for rot, x, drop_y, blocks in _placements(state, piece):
+                    cells = [(x + bx, drop_y + by) for bx, by in blocks]
+                    lines_cleared = state.push(blocks, x, drop_y)
+                    total = score - state_cost(state, cells, lines_cleared, weights)
+                    if lines_cleared:
+                        state.clear_lines()
+                    key = (state.key(), next_held, next_qi)
+                    prev = children.get(key)
+                    if prev is None or total > prev[0]:
+                        children[key] = (total, state.board[:], next_held, next_qi,
+                                         first or (rot, x, is_hold))
+                    state.pop()
+        if not children:
+            break
+        beam = heapq.nlargest(beam_width, children.values(), key=itemgetter(0))
+
+    return beam
+
+
+def anytime_search(grid, queue, held_piece, can_hold, weights,
+                   beam_width=BEAM_WIDTH, depth=None,
+                   time_limit=ANYTIME_TIME_LIMIT):
+    """
+    beam_search() with a time budget. The first ply (every placement of
+    both hold branches, ranked by its own -cost_function()) always
+    completes and gives a move at once; each later ply that finishes
+    before time_limit seconds replaces it with the deeper best move.
+    A ply cut off by the deadline is discarded.
+
+    Args:
+        time_limit: Seconds for the whole search
+        (other args as beam_search)
+
+    Returns:
+        (best_rot, best_x, should_hold, best_score) or None
+    """
+    deadline = time.perf_counter() + time_limit
+    queue = tuple(queue)
+    if depth is None:
+        depth = max(1, len(queue) - 1)
+
+    best = _beam(grid, queue, held_piece, can_hold, weights, beam_width, depth,
+                 deadline)[0]
+    if best[4] is None:
+        return None
+    rot, x, should_hold = best[4]
+    return (rot, x, should_hold, best[0])
+
+
+# ---------------------------------------------------------------------------
+# Expectimax over the 7-bag
+# ---------------------------------------------------------------------------
+
+def expected_next_score(state, bag, weights, weights_key=None):
+    """
+    Chance node: mean best score of the next piece over the pieces still
+    in the current 7-bag (a fresh bag, i.e. all seven, when it is empty).
+    Memoized per (board, remaining bag).
+    """
+    if weights_key is None:
+        weights_key = tuple(weights)
+    pieces = tuple(sorted(set(bag))) if bag else tuple(sorted(TETROMINOS))
+    key = (state.key(), pieces, weights_key)
+    cached = _chance_table.get(key)
+    if cached is not None:
+        return cached
+
+    total = 0.0
+    for piece in pieces:
+        score = _evaluate_next_state(state, piece, weights, weights_key)
+        if score == float("-inf"):
+            # A piece with nowhere to go tops out whatever else may come.
+            total = score
+            break
+        total += score
+    expected = total / len(pieces)
+
+    if len(_chance_table) >= TRANSPOSITION_SIZE:
+        _chance_table.clear()
+    _chance_table[key] = expected
+    return expected
+
+
+def expectimax_search(grid, queue, held_piece, can_hold, bag, weights,
+                      beam_width=BEAM_WIDTH, depth=None,
+                      time_limit=EXPECTIMAX_TIME_LIMIT):
+    """
+    beam_search() plus one more ply at the leaves. A leaf whose next piece
+    is still in the queue takes its best placement; a leaf that has used
+    up the visible queue (e.g. after a first hold) becomes a chance node
+    averaged over the remaining 7-bag contents (Main.bag).
+
+    time_limit seconds cover the whole search: the beam stops deepening
+    when they run out (as in anytime_search()), and its leaves are then
+    expanded best-first until the same deadline; leaves not reached are
+    dropped, so the best beam leaf is always scored.
+
+    Args:
+        bag: Pieces left in the current 7-bag, after the visible queue
+        (other args as beam_search)
+
+    Returns:
+        (best_rot, best_x, should_hold, best_score) or None
+    """
+    deadline = time.perf_counter() + time_limit
+    queue = tuple(queue)
+    if depth is None:
+        depth = max(1, len(queue) - 1)
+    weights_key = tuple(weights)
+
+    best = None
+    for score, board, held, qi, first in _beam(grid, queue, held_piece, can_hold,
+                                              weights, beam_width, depth, deadline):
+        if first is None:
             return None
-        return (result_b[0], result_b[1], True)     # Hold, then play
+        state = BoardState(board)
+        if qi < len(queue):
+            score += _evaluate_next_state(state, queue[qi], weights, weights_key)
+        else:
+            score += expected_next_score(state, bag, weights, weights_key)
+        if best is None or score > best[0]:
+            best = (score, first)
+        if time.perf_counter() >= deadline:
+            break
+
+    rot, x, should_hold = best[1]
+    return (rot, x, should_hold, best[0])
+
+
+def find_best_move_for_mode(mode, grid, queue, held_piece, is_held, weights,
+                            bag=None, beam_width=BEAM_WIDTH,
+                            time_limit=EXPECTIMAX_TIME_LIMIT):
+    """
+    Hold-aware move for queue[0] using one of SEARCH_MODES.
+
+    Args:
+        queue: Current piece followed by the preview (only queue[1] is
+            used by SEARCH_LOOKAHEAD)
+        bag: Remaining 7-bag contents (SEARCH_EXPECTIMAX only)
+        time_limit: Seconds for the whole SEARCH_EXPECTIMAX or
+            SEARCH_ANYTIME search
+
+    Returns:
+        (best_rot, best_x, should_hold) or None
+    """
+    queue = tuple(queue)
+    if mode == SEARCH_EXPECTIMAX:
+        result = expectimax_search(grid, queue, held_piece, not is_held, bag,
+                                   weights, beam_width, time_limit=time_limit)
+    elif mode == SEARCH_ANYTIME:
+        result = anytime_search(grid, queue, held_piece, not is_held, weights,
+                                beam_width, time_limit=time_limit)
+    elif mode == SEARCH_BEAM:
+        result = beam_search(grid, queue, held_piece, not is_held, weights,
+                             beam_width)
+    else:
+        # Same moves as find_best_move_with_hold_scored(), scored in NumPy
+        next_shape = queue[1] if len(queue) > 1 else None
+        result = find_best_move_with_hold_batch(grid, queue[0], next_shape,
+                                                held_piece, is_held, weights)
+    if result is None:
+        return None
+    return result[:3]
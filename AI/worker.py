@@ -5,62 +5,290 @@ Two workers run in parallel:
   - PLAY worker: evaluates "play current piece" with 1-step lookahead
   - HOLD worker: evaluates "hold & play held piece" with 1-step lookahead
 
-Both return scores so the main process can compare branches.
+Both return scores so the main process can compare branches. The search
+itself runs through the NumPy batch evaluator (batch_evaluator.py), which
+scores every placement of a ply with one feature matrix.
 
 Protocol:
-  Receive: (piece_id, grid_tuple, shape, next_shape)
+  Receive: (piece_id, board, shape, next_shape[, beam])
   Send:    (piece_id, best_rot, best_x, best_score)
 
+board is the packed 200-bit int from BitboardCore.pack() (a tuple-of-tuples
+grid is still accepted), so a request pickles to a few dozen bytes.
+
+With beam = (queue, held, depth, width) the worker runs evaluator.beam_search()
+over the piece queue instead of the 1-step lookahead; the first ply places
+queue[0] without holding. beam = (queue, held, depth, width, bag, time_limit)
+runs evaluator.expectimax_search() with the remaining 7-bag contents;
+with bag None it runs evaluator.anytime_search() within time_limit.
+
+Batches: a worker also accepts a LIST of such requests and answers with
+a list of replies in the same order. All 1-step lookahead jobs of a batch
+are scored together in one batch_evaluator.best_moves() call.
+
+Stale requests: workers drain their pipe before searching and skip any
+request superseded by a newer one for the same game and branch, so a
+slow worker never works through a backlog the game has already left
+behind. ('cancel', piece_id) drops queued requests explicitly.
+
 Zero Pygame display dependency. Pure integer computation.
 """
 
 import os
 import sys
 
+import numpy as np
+
 # Ensure AI/ is on the path for evaluator imports.
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__))))
 # Ensure Tetris/ is on the path for settings/core imports used by evaluator.
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "Tetris")))
 
-from evaluator import find_best_move_scored
+from batch_evaluator import SHAPE_INDEX, best_moves, find_best_move_batch, occupancy
+from evaluator import anytime_search, beam_search, expectimax_search
+from Tetris.core import BitboardCore
 
 
 _DEFAULT_WEIGHTS = [1.275, 4.0, 1.2, 0.8, 0.5, 3.0, 20, 5, 2, 0.1]
 
 
+def solve(data, weights):
+    """
+    Run one search request.
+
+    Args:
+        data: (piece_id, board, shape, next_shape[, beam])
+        weights: list of 10+ floats
+
+    Returns:
+        (piece_id, best_rot, best_x, best_score)
+    """
+    piece_id, board, shape, next_shape = data[:4]
+    beam = data[4] if len(data) > 4 else None
+    if isinstance(board, int):
+        grid = BitboardCore.unpack(board)    # Bitboard rows; the search takes them as-is
+    else:
+        grid = [list(row) for row in board]
+
+    if beam is not None:
+        queue, held, depth, width = beam[:4]
+        if len(beam) > 4:
+            bag, time_limit = beam[4:6]
+            if bag is None:
+                result = anytime_search(grid, queue, held, False, weights,
+                                        width, depth, time_limit)
+            else:
+                result = expectimax_search(grid, queue, held, False, bag, weights,
+                                           width, depth, time_limit)
+        else:
+            result = beam_search(grid, queue, held, False, weights, width, depth)
+        if result is not None:
+            result = (result[0], result[1], result[3])
+    else:
+        result = find_best_move_batch(grid, shape, next_shape, weights)
+
+    if result is None:
+        return (piece_id, None, None, float("-inf"))
+    best_rot, best_x, best_score = result
+    return (piece_id, best_rot, best_x, best_score)
+
+
+def solve_batch(jobs):
+    """
+    Run many search requests at once.
+
+    Args:
+        jobs: list of (data, weights), data as in solve()
+
+    Returns:
+        list of (piece_id, best_rot, best_x, best_score), in job order
+    """
+    replies = [None] * len(jobs)
+    lookahead = []
+    for i, (data, weights) in enumerate(jobs):
+        if len(data) > 4 and data[4] is not None:
+            replies[i] = solve(data, weights)
+        else:
+            lookahead.append(i)
+
+    if lookahead:
+        boards, shapes, nexts, ws = [], [], [], []
+        for i in lookahead:
+            data, weights = jobs[i]
+            board, shape, next_shape = data[1], data[2], data[3]
+            if isinstance(board, int):
+                board = BitboardCore.unpack(board)
+            boards.append(occupancy(board))
+            shapes.append(SHAPE_INDEX[shape])
+            nexts.append(SHAPE_INDEX[next_shape] if next_shape else -1)
+            ws.append(list(weights)[:10])
+        rot, x, _, score = best_moves(
+            np.stack(boards), np.array(shapes), np.array(nexts),
+            np.array(ws, dtype=np.float64),
+        )
+        for j, i in enumerate(lookahead):
+            piece_id = jobs[i][0][0]
+            if rot[j] < 0:
+                replies[i] = (piece_id, None, None, float("-inf"))
+            else:
+                replies[i] = (piece_id, int(rot[j]), int(x[j]), float(score[j]))
+    return replies
+
+
+def _no_move(data):
+    """Reply for a request whose search failed: no placement, like a dead board."""
+    return (data[0], None, None, float("-inf"))
+
+
+def _drain(pipe, first):
+    """first plus every message already waiting in the pipe, in order."""
+    msgs = [first]
+    while pipe.poll():
+        msgs.append(pipe.recv())
+    return msgs
+
+
 def run_ai_worker(pipe, weights=None):
     """
     Generic worker loop. Receives a piece to evaluate, returns best move + score.
     The CALLER decides what piece to send (current or held).
 
     Protocol:
-        Receive: (piece_id, grid_tuple, shape, next_shape)
+        Receive: (piece_id, board, shape, next_shape[, beam])
+                 ('cancel', piece_id)   drop queued requests up to piece_id
         Send:    (piece_id, best_rot, best_x, best_score)
+        or a list of requests -> a list of replies
+
+    The pipe is drained before each search: a single request superseded
+    by a newer one (the game has moved on) is skipped without a reply.
+    Lists are always answered in full. A search that raises is answered
+    with no move (best_rot None).
     """
     if weights is None:
         weights = _DEFAULT_WEIGHTS
 
     while True:
+        latest = None
+        batches = []
         try:
-            data = pipe.recv()
-            if data is None:
-                break    # Shutdown signal
+            msgs = _drain(pipe, pipe.recv())
+            shutdown = False
+            for data in msgs:
+                if data is None:
+                    shutdown = True    # Shutdown signal
+                    break
+                if isinstance(data, list):
+                    batches.append(data)
+                elif data[0] == 'cancel':
+                    if latest is not None and latest[0] <= data[1]:
+                        latest = None
+                else:
+                    latest = data    # Supersedes any older request
+            if shutdown:
+                break
 
-            piece_id, grid_tuple, shape, next_shape = data
-            grid = [list(row) for row in grid_tuple]
+            while batches:
+                pipe.send(solve_batch([(job, weights) for job in batches[0]]))
+                batches.pop(0)
+            if latest is not None:
+                pipe.send(solve(latest, weights))
+                latest = None
 
-            result = find_best_move_scored(grid, shape, next_shape, weights)
+        except EOFError:
+            break
+        except Exception as e:
+            print(f"[AI Worker] Error: {e}")
+            import traceback
+            traceback.print_exc()
+            # Answer the failed searches so the game is not left waiting.
+            try:
+                for batch in batches:
+                    pipe.send([_no_move(job) for job in batch])
+                if latest is not None:
+                    pipe.send(_no_move(latest))
+            except (EOFError, OSError):
+                break
+            continue
 
-            if result is None:
-                pipe.send((piece_id, None, None, float("-inf")))
-            else:
-                best_rot, best_x, best_score = result
-                pipe.send((piece_id, best_rot, best_x, best_score))
+
+def run_pool_worker(pipe):
+    """
+    Worker loop for AIWorkerPool (worker_pool.py). One process serves many
+    games; each game registers its weights once.
+
+    Protocol:
+        Receive: ('weights', game_id, weights)   register / replace weights
+                 ('job', game_id, branch, data)  data as in run_ai_worker
+                 ('batch', [(game_id, branch, data), ...])
+                 ('cancel', game_id, branch, piece_id)
+                                                 drop queued requests up to piece_id
+                 ('close', game_id)              forget the game
+                 None                            shutdown
+        Send:    [(game_id, branch, (piece_id, best_rot, best_x, best_score)), ...]
+
+    Everything waiting in the pipe is read before searching, and only the
+    newest request per (game_id, branch) is kept; the survivors are
+    solved together (one NumPy call for all 1-step jobs) and answered in
+    one list. Superseded and cancelled requests get no reply; jobs whose
+    search raises are answered with no move (best_rot None).
+    """
+    game_weights = {}
+
+    while True:
+        pending = {}    # (game_id, branch) -> newest data
+        try:
+            shutdown = False
+            for msg in _drain(pipe, pipe.recv()):
+                if msg is None:
+                    shutdown = True    # Shutdown signal
+                    break
+
+                kind = msg[0]
+                if kind == 'job':
+                    jobs = [msg[1:]]
+                elif kind == 'batch':
+                    jobs = msg[1]
+                else:
+                    jobs = ()
+                    if kind == 'weights':
+                        game_id, weights = msg[1], msg[2]
+                        game_weights[game_id] = weights if weights is not None else _DEFAULT_WEIGHTS
+                    elif kind == 'close':
+                        game_weights.pop(msg[1], None)
+                        for key in [k for k in pending if k[0] == msg[1]]:
+                            del pending[key]
+                    elif kind == 'cancel':
+                        key = (msg[1], msg[2])
+                        if key in pending and pending[key][0] <= msg[3]:
+                            del pending[key]
+                for game_id, branch, data in jobs:
+                    pending.pop((game_id, branch), None)
+                    pending[(game_id, branch)] = data
+            if shutdown:
+                break
+            if not pending:
+                continue
+
+            keys = list(pending)
+            replies = solve_batch([
+                (pending[key], game_weights.get(key[0], _DEFAULT_WEIGHTS))
+                for key in keys
+            ])
+            pipe.send([(game_id, branch, reply)
+                       for (game_id, branch), reply in zip(keys, replies)])
+            pending = {}
 
         except EOFError:
             break
         except Exception as e:
-            print(f"[AI Worker] Error: {e}")
+            print(f"[AI Pool Worker] Error: {e}")
             import traceback
             traceback.print_exc()
+            # Answer the failed searches so no game is left waiting.
+            try:
+                if pending:
+                    pipe.send([(game_id, branch, _no_move(data))
+                               for (game_id, branch), data in pending.items()])
+            except (EOFError, OSError):
+                break
             continue
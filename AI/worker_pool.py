@@ -0,0 +1,259 @@
+"""
+AI Worker Pool — Long-Lived Search Processes Shared by Many Games
+
+Replaces the two run_ai_worker processes that Main spawns per game with
+a fixed set of run_pool_worker processes (default: one per CPU core).
+Any number of Main/TetrisAI instances in the owning process register
+with connect() and get back a PLAY and a HOLD endpoint that behave like
+the old Pipe connections (send / poll / recv), so TetrisAI is unchanged.
+
+Routing: a game's PLAY and HOLD requests go to fixed, adjacent workers
+(by game id and branch), so both branches of a piece run in parallel
+and each worker only holds the weights of its own games. Replies are
+tagged with (game_id, branch) and the piece_id from the request, and
+are demultiplexed into per-endpoint inboxes on poll()/recv().
+
+With batch=True, requests are buffered per worker and sent as one
+('batch', [...]) message by flush(); the worker scores all 1-step jobs
+of the batch in a single NumPy call. The driver calls flush() once per
+round over its games (recv() also flushes, so it never blocks on an
+unsent request).
+
+Stale requests: a newer request for the same (game, branch) replaces a
+buffered one, cancel() drops requests up to a piece id, and workers
+skip superseded requests still queued in their pipe. Skipped requests
+get no reply, so callers poll() for the piece id they are waiting on
+(as TetrisAI does) rather than counting replies.
+
+Game ids include the owner's PID, so a pool handed to a fresh child
+process (e.g. a GA tray per generation) never matches replies left over
+from the previous owner.
+"""
+
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+
+# Ensure AI/ is on the path for worker imports.
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from worker import run_pool_worker
+
+BRANCH_PLAY = 0
+BRANCH_HOLD = 1
+
+
+class PoolConnection:
+    """Pipe-like endpoint for one branch (PLAY or HOLD) of one game."""
+
+    def __init__(self, pool, game_id, branch):
+        self._pool = pool
+        self.game_id = game_id
+        self.branch = branch
+
+    def send(self, data):
+        """
+        Submit a request, cancel with ('cancel', piece_id), or release
+        the game when data is None.
+        """
+        if data is None:
+            self.close()
+        elif data[0] == 'cancel':
+            self._pool.cancel(self.game_id, self.branch, data[1])
+        else:
+            self._pool._submit(self.game_id, self.branch, data)
+
+    def poll(self, timeout=0.0):
+        return self._pool._has_reply(self.game_id, self.branch, timeout)
+
+    def recv(self):
+        return self._pool._next_reply(self.game_id, self.branch)
+
+    def close(self):
+        self._pool.release(self.game_id)
+
+
+class AIWorkerPool:
+    """
+    Fixed pool of search processes shared by every game of one owner.
+
+    Usage:
+        pool = AIWorkerPool()
+        game = Main(worker_pool=pool, ...)    # per game
+        ...
+        pool.close()                          # once, at the very end
+    """
+
+    def __init__(self, n_workers=None, batch=False):
+        if n_workers is None:
+            n_workers = os.cpu_count() or 1
+        self.n_workers = max(1, n_workers)
+        self.batch = batch
+        self._conns = []
+        self._procs = []
+        for _ in range(self.n_workers):
+            conn, child = multiprocessing.Pipe()
+            proc = multiprocessing.Process(
+                target=run_pool_worker, args=(child,), daemon=True
+            )
+            proc.start()
+            self._conns.append(conn)
+            self._procs.append(proc)
+        self._reset_owner()
+
+    def _reset_owner(self):
+        self._owner = os.getpid()
+        self._next_game = 0
+        self._inbox = {}    # (game_id, branch) -> deque of replies
+        self._outbox = [[] for _ in range(self.n_workers)]    # batch mode
+        self._games = set()
+
+    def __getstate__(self):
+        # Only the connections travel to a child process; the children
+        # stay owned (and are joined) by the process that created them.
+        return {'n_workers': self.n_workers, 'batch': self.batch,
+                '_conns': self._conns}
+
+    def __setstate__(self, state):
+        self.n_workers = state['n_workers']
+        self.batch = state['batch']
+        self._conns = state['_conns']
+        self._procs = []
+        self._reset_owner()
+
+    # ------------------------------------------------------------------
+    # Game registration
+    # ------------------------------------------------------------------
+    def connect(self, weights=None):
+        """
+        Register a game.
+
+        Returns:
+            (play_conn, hold_conn) PoolConnection endpoints
+        """
+        if os.getpid() != self._owner:
+            self._reset_owner()
+        game_id = (self._owner << 32) | self._next_game
+        self._next_game += 1
+        self._games.add(game_id)
+        weights = list(weights) if weights is not None else None
+        for branch in (BRANCH_PLAY, BRANCH_HOLD):
+            self._route(game_id, branch).send(('weights', game_id, weights))
+            self._inbox[(game_id, branch)] = deque()
+        return (PoolConnection(self, game_id, BRANCH_PLAY),
+                PoolConnection(self, game_id, BRANCH_HOLD))
+
+    def release(self, game_id):
+        """Forget a game. Replies still in flight for it are discarded."""
+        if game_id not in self._games:
+            return
+        self._games.discard(game_id)
+        for jobs in self._outbox:
+            jobs[:] = [job for job in jobs if job[0] != game_id]
+        for branch in (BRANCH_PLAY, BRANCH_HOLD):
+            self._inbox.pop((game_id, branch), None)
+            try:
+                self._route(game_id, branch).send(('close', game_id))
+            except (OSError, EOFError):
+                pass
+
+    def cancel(self, game_id, branch, piece_id):
+        """Drop requests of one game branch with piece ids up to piece_id."""
+        if game_id not in self._games:
+            return
+        jobs = self._outbox[self._worker_index(game_id, branch)]
+        jobs[:] = [job for job in jobs
+                   if job[:2] != (game_id, branch) or job[2][0] > piece_id]
+        self._route(game_id, branch).send(('cancel', game_id, branch, piece_id))
+
+    def close(self):
+        """Shut down every worker (owner process only)."""
+        for conn in self._conns:
+            try:
+                conn.send(None)
+            except (OSError, EOFError):
+                pass
+        for proc in self._procs:
+            proc.join(timeout=2)
+            if proc.is_alive():
+                proc.terminate()
+        self._procs = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+    # ------------------------------------------------------------------
+    # Request routing
+    # ------------------------------------------------------------------
+    def _worker_index(self, game_id, branch):
+        return (2 * game_id + branch) % self.n_workers
+
+    def _route(self, game_id, branch):
+        return self._conns[self._worker_index(game_id, branch)]
+
+    def _submit(self, game_id, branch, data):
+        if self.batch:
+            # A newer request for the same branch supersedes a buffered one
+            jobs = self._outbox[self._worker_index(game_id, branch)]
+            jobs[:] = [job for job in jobs if job[:2] != (game_id, branch)]
+            jobs.append((game_id, branch, data))
+        else:
+            self._route(game_id, branch).send(('job', game_id, branch, data))
+
+    def flush(self):
+        """Send every buffered request, one batch message per worker."""
+        for conn, jobs in zip(self._conns, self._outbox):
+            if jobs:
+                conn.send(('batch', jobs[:]))
+                jobs.clear()
+
+    def _deliver(self, game_id, branch, reply):
+        inbox = self._inbox.get((game_id, branch))
+        if inbox is not None:
+            inbox.append(reply)
+
+    def _pump(self):
+        """Move every reply waiting in the worker pipes to its inbox."""
+        for conn in self._conns:
+            while conn.poll():
+                msg = conn.recv()
+                if isinstance(msg, list):
+                    for game_id, branch, reply in msg:
+                        self._deliver(game_id, branch, reply)
+                else:
+                    self._deliver(*msg)
+
+    def _has_reply(self, game_id, branch, timeout=0.0):
+        """Like Connection.poll(timeout): wait up to timeout seconds for a reply."""
+        inbox = self._inbox.get((game_id, branch))
+        if inbox is None:
+            return False
+        if not inbox:
+            self._pump()
+        if inbox or not timeout:
+            return bool(inbox)
+        self.flush()    # Never wait on a request still in the outbox
+        conn = self._route(game_id, branch)
+        deadline = time.monotonic() + timeout
+        while not inbox:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not conn.poll(remaining):
+                break
+            self._pump()
+        return bool(inbox)
+
+    def _next_reply(self, game_id, branch):
+        inbox = self._inbox[(game_id, branch)]
+        conn = self._route(game_id, branch)
+        if not inbox:
+            self.flush()
+        while not inbox:
+            conn.poll(None)
+            self._pump()
+        return inbox.popleft()
@@ -0,0 +1,226 @@
+"""
+Batch Environment — N Headless Games Stepped in Lockstep
+
+Holds every board as one (n_games, ROWS, COLUMNS) NumPy array and
+advances all running games by one placement per step(): the play and
+hold branches of every game are scored in a single batched search
+(AI/batch_evaluator.best_moves), pieces are locked with one fancy-index
+write, and line clears, scoring and spawn checks are vectorized.
+
+Game rules follow HeadlessGame (7-bag sequence per seed, 3-piece
+preview, hold, scoring); piece sequences are generated once per seed
+and shared by every game using that seed. A piece with no reachable
+placement falls straight down from spawn, as in HeadlessGame.step().
+"""
+
+import os
+import random
+import sys
+
+import numpy as np
+
+from settings import BLOCK_OFFSET, COLUMNS, ROWS, SCORE_DATA, TETROMINOS, create_7bag, get_next_tetromino
+from headless import SECONDS_PER_PIECE
+from replay import Replay
+
+# Ensure project root is importable (for AI.batch_evaluator)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from AI.batch_evaluator import SHAPES, SHAPE_INDEX, best_moves, clear_full_rows
+
+_DEFAULT_WEIGHTS = [1.275, 4.0, 1.2, 0.8, 0.5, 3.0, 20, 5, 2, 0.1]
+_SPAWN_X = int(BLOCK_OFFSET.x)
+_SPAWN_Y = int(BLOCK_OFFSET.y)
+
+# Block offsets indexed by [shape_idx, rot] -> (4,)
+_BLOCK_DX = np.array([[[bx for bx, _ in r] for r in TETROMINOS[s]['rotations']] for s in SHAPES])
+_BLOCK_DY = np.array([[[by for _, by in r] for r in TETROMINOS[s]['rotations']] for s in SHAPES])
+_SCORE = np.array([0] + [SCORE_DATA[n] for n in range(1, 5)])
+
+
+class _PieceStream:
+    """Piece sequence for one seed, drawn lazily (same order as Main)."""
+
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+        self.bag = create_7bag(self.rng)
+        self.shapes = []
+
+    def __getitem__(self, i):
+        while len(self.shapes) <= i:
+            self.shapes.append(SHAPE_INDEX[get_next_tetromino(self.bag, self.rng)])
+        return self.shapes[i]
+
+
+class BatchTetrisEnv:
+    """
+    Lockstep simulator for many AI games.
+
+    Per-game stats are NumPy arrays indexed by game: lines, score, level,
+    num_1line, num_2line, num_3line, num_tetris, pieces, is_game_over.
+    """
+
+    def __init__(self, weights_list, seeds=None, record=False):
+        n = len(weights_list)
+        if seeds is None:
+            sysrand = random.SystemRandom()
+            seeds = [sysrand.randrange(1 << 62) for _ in range(n)]
+        self.n = n
+        self.seeds = list(seeds)
+        # record=True: one replay.Replay per game
+        self.replays = [Replay(s) for s in self.seeds] if record else None
+        self.weights = np.array([list(w) for w in weights_list], dtype=np.float64)
+
+        streams = {}
+        self._streams = [streams.setdefault(s, _PieceStream(s)) for s in self.seeds]
+
+        self.boards = np.zeros((n, ROWS, COLUMNS), dtype=bool)
+        # First piece is stream[0]; the preview starts at stream[pos].
+        self.shape = np.array([st[0] for st in self._streams], dtype=np.int64)
+        self.pos = np.ones(n, dtype=np.int64)
+        self.held = np.full(n, -1, dtype=np.int64)
+
+        self.is_game_over = np.zeros(n, dtype=bool)
+        self.pieces = np.zeros(n, dtype=np.int64)
+        self.lines = np.zeros(n, dtype=np.int64)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.level = np.ones(n, dtype=np.int64)
+        self.num_1line = np.zeros(n, dtype=np.int64)
+        self.num_2line = np.zeros(n, dtype=np.int64)
+        self.num_3line = np.zeros(n, dtype=np.int64)
+        self.num_tetris = np.zeros(n, dtype=np.int64)
+
+    @property
+    def time_sec(self):
+        """Simulated seconds survived per game."""
+        return (self.pieces * SECONDS_PER_PIECE).astype(np.int64)
+
+    def preview(self, games):
+        """SHAPE_INDEX of the first preview piece for each game in games."""
+        return np.array([self._streams[g][self.pos[g]] for g in games], dtype=np.int64)
+
+    def _spawn_drop_y(self, g):
+        """Landing row of game g's current piece dropped from spawn (rotation 0)."""
+        shp = self.shape[g]
+        xs = _SPAWN_X + _BLOCK_DX[shp, 0]
+        dy = _BLOCK_DY[shp, 0]
+        board = self.boards[g]
+        y = _SPAWN_Y
+        while True:
+            ys = y + 1 + dy
+            if (ys >= ROWS).any() or board[np.maximum(ys, 0), xs][ys >= 0].any():
+                return y
+            y += 1
+
+    def _advance(self, games):
+        """get_next_shape() for each game in games."""
+        for g in games:
+            self.shape[g] = self._streams[g][self.pos[g]]
+            self.pos[g] += 1
+
+    def step(self, active=None):
+        """
+        Place one piece in every running game (or in the given games).
+
+        Returns:
+            Number of games that were stepped.
+        """
+        games = np.nonzero(~self.is_game_over)[0] if active is None else active
+        m = len(games)
+        if m == 0:
+            return 0
+
+        boards = self.boards[games]
+        weights = self.weights[games]
+        cur = self.shape[games]
+        nxt = self.preview(games)
+        held = self.held[games]
+
+        # Play and hold branches for every game in one batched search.
+        hold_shape = np.where(held >= 0, held, nxt)
+        hold_next = np.where(held >= 0, nxt, -1)
+        rot, x, drop_y, score = best_moves(
+            np.concatenate([boards, boards]),
+            np.concatenate([cur, hold_shape]),
+            np.concatenate([nxt, hold_next]),
+            np.concatenate([weights, weights]),
+        )
+        use_hold = score[m:] > score[:m]
+        rot, x, drop_y = rot[:m], x[:m], drop_y[:m]
+
+        # Apply holds, then re-search the swapped-in piece with hold locked out.
+        if use_hold.any():
+            h = np.nonzero(use_hold)[0]
+            hg = games[h]
+            first = self.held[hg] < 0
+            self.held[hg] = cur[h]
+            self.shape[hg[~first]] = held[h[~first]]
+            self._advance(hg[first])
+            if self.replays is not None:
+                for g in hg.tolist():
+                    self.replays[g].hold()
+            rot[h], x[h], drop_y[h], _ = best_moves(
+                boards[h], self.shape[hg], self.preview(hg), weights[h]
+            )
+
+        # No reachable placement: let it fall where it spawned.
+        for i in np.nonzero(rot < 0)[0].tolist():
+            rot[i], x[i] = 0, _SPAWN_X
+            drop_y[i] = self._spawn_drop_y(games[i])
+        if self.replays is not None:
+            for g, r, px in zip(games.tolist(), rot.tolist(), x.tolist()):
+                self.replays[g].lock(r, px)    # Straight drops only
+
+        shp = self.shape[games]
+        xs = x[:, None] + _BLOCK_DX[shp, rot]
+        ys = drop_y[:, None] + _BLOCK_DY[shp, rot]
+
+        # A piece locking entirely above the board ends the game unplaced.
+        above = (ys < 0).all(axis=1)
+        if above.any():
+            self.is_game_over[games[above]] = True
+            keep = ~above
+            games, shp, xs, ys = games[keep], shp[keep], xs[keep], ys[keep]
+            if len(games) == 0:
+                return m
+
+        # Lock pieces (cells above the board are dropped), clear lines, score.
+        boards = self.boards[games]
+        visible = ys >= 0
+        rows = np.broadcast_to(np.arange(len(games))[:, None], ys.shape)
+        boards[rows[visible], ys[visible], xs[visible]] = True
+        lines = (np.count_nonzero(boards, axis=2) == COLUMNS).sum(axis=1)
+        self.boards[games] = clear_full_rows(boards)
+
+        self.pieces[games] += 1
+        self.lines[games] += lines
+        self.score[games] += _SCORE[lines] * self.level[games]
+        self.num_1line[games] += lines == 1
+        self.num_2line[games] += lines == 2
+        self.num_3line[games] += lines == 3
+        self.num_tetris[games] += lines == 4
+
+        # Spawn the next piece and check for top-out.
+        self._advance(games)
+        shp = self.shape[games]
+        sx = _SPAWN_X + _BLOCK_DX[shp, 0]
+        sy = _SPAWN_Y + _BLOCK_DY[shp, 0]
+        visible = sy >= 0
+        hit = self.boards[games[:, None], np.maximum(sy, 0), sx] & visible
+        self.is_game_over[games[hit.any(axis=1)]] = True
+        return m
+
+    def run(self, max_pieces=None, games=None):
+        """Step until every game (or every game in games) is over or has placed max_pieces."""
+        selected = np.ones(self.n, dtype=bool)
+        if games is not None:
+            selected = np.zeros(self.n, dtype=bool)
+            selected[list(games)] = True
+        while True:
+            running = ~self.is_game_over & selected
+            if max_pieces is not None:
+                running &= self.pieces < max_pieces
+            games = np.nonzero(running)[0]
+            if len(games) == 0:
+                return self
+            self.step(games)
@@ -15,8 +15,17 @@ Phase 3 additions:
 - unlock_piece_mut()    : Undo in-place lock (restore grid after AI eval)
 - clear_lines_mut()     : In-place line clear (returns cleared count)
 - evaluate_all_placements() : Batch-generate all valid (rot, x, drop_y) for a shape
+
+Bitboard backend:
+- BitboardCore          : Same static API on a list of per-row int bitmasks
+- PIECE_MASKS           : Precomputed (dy, mask) rows for every (shape, rot, x)
+- placements_for_heights() : LRU-cached placements keyed on the column height profile
+- BoardState            : Incremental heights / fill counts / holes with push/pop undo
+- pack() / unpack() / BoardState.key() : Whole board as one int (hash key, IPC payload)
 """
 
+from functools import lru_cache
+
 # Import only the data we need from settings (no Pygame objects used here)
 from settings import TETROMINOS, SRS_KICKS_GENERAL, SRS_KICKS_I, COLUMNS, ROWS
 
@@ -367,3 +376,524 @@ class TetrisCore:
                 placements.append((rot, x, drop_y, blocks))
 
         return placements
+
+
+# ----------------------------------------------------------------------
+# Bitboard backend — one Python int per row
+# ----------------------------------------------------------------------
+FULL_ROW = (1 << COLUMNS) - 1
+
+
+def _build_piece_masks(cols=COLUMNS):
+    """
+    Precompute per-row bitmasks for every (shape, rot, x).
+
+    Returns:
+        {(shape, rot): {x: ((dy, mask), ...)}} — rows are ordered bottom-up
+        so a falling piece hits its lowest row first.
+    """
+    table = {}
+    for shape, data in TETROMINOS.items():
+        for rot, blocks in enumerate(data['rotations']):
+            min_bx = min(bx for bx, _ in blocks)
+            max_bx = max(bx for bx, _ in blocks)
+            per_x = {}
+            for x in range(-min_bx, cols - max_bx):
+                rows = {}
+                for bx, by in blocks:
+                    rows[by] = rows.get(by, 0) | (1 << (x + bx))
+                per_x[x] = tuple(sorted(rows.items(), reverse=True))
+            table[(shape, rot)] = per_x
+    return table
+
+
+PIECE_MASKS = _build_piece_masks()
+
+def _build_piece_bottoms():
+    """
+    Lowest block offset of every occupied column, for surface-only drops.
+
+    Returns:
+        {(shape, rot): ((x, ((col, max_by), ...)), ...)} over the same x
+        range as PIECE_MASKS.
+    """
+    table = {}
+    for (shape, rot), per_x in PIECE_MASKS.items():
+        bottom = {}
+        for bx, by in TETROMINOS[shape]['rotations'][rot]:
+            bottom[bx] = max(by, bottom.get(bx, by))
+        table[(shape, rot)] = tuple(
+            (x, tuple((x + bx, by) for bx, by in sorted(bottom.items())))
+            for x in per_x
+        )
+    return table
+
+
+_PIECE_BOTTOMS = _build_piece_bottoms()
+
+# Surfaces memoized by placements_for_heights(). Entries share their
+# (rot, x, drop_y, blocks) tuples through _PLACEMENTS, so one costs
+# ~0.5 KB (the height key plus a tuple of references), ~8 MB when full.
+PLACEMENT_CACHE_SIZE = 1 << 14
+
+# (shape, rot, x, drop_y) -> the one shared placement tuple
+_PLACEMENTS = {}
+
+# Lets the blocks-based API (shared with TetrisCore) find the mask table.
+_BLOCKS_KEY = {
+    tuple(blocks): (shape, rot)
+    for shape, data in TETROMINOS.items()
+    for rot, blocks in enumerate(data['rotations'])
+}
+
+
+class BitboardCore:
+    """
+    Bitboard variant of TetrisCore.
+
+    The board is a list of ROWS ints; bit c of board[r] is set when
+    column c of row r is occupied. Method names and signatures mirror
+    the TetrisCore static API, so callers can switch backends by
+    converting the grid once with from_grid().
+    """
+
+    @staticmethod
+    def create_board(rows=ROWS):
+        """Create a fresh empty bitboard."""
+        return [0] * rows
+
+    @staticmethod
+    def from_grid(grid):
+        """
+        Pack a 2D integer grid into a bitboard. A bitboard (rows already
+        int bitmasks, e.g. Game.board) is returned as a copy.
+        """
+        if grid and isinstance(grid[0], int):
+            return list(grid)
+        board = []
+        for row in grid:
+            bits = 0
+            for c, cell in enumerate(row):
+                if cell:
+                    bits |= 1 << c
+            board.append(bits)
+        return board
+
+    @staticmethod
+    def to_grid(board, cols=COLUMNS):
+        """Unpack a bitboard into a 2D integer grid (0 / 1 cells)."""
+        return [[(bits >> c) & 1 for c in range(cols)] for bits in board]
+
+    @staticmethod
+    def masks_for(blocks):
+        """Return the {x: row masks} table for a rotation's block list."""
+        return PIECE_MASKS[_BLOCKS_KEY[tuple(blocks)]]
+
+    @staticmethod
+    def fits(board, masks, pos_y, rows=ROWS):
+        """Collision check against precomputed row masks for one x."""
+        for dy, mask in masks:
+            r = pos_y + dy
+            if r >= rows:
+                return False
+            if r >= 0 and board[r] & mask:
+                return False
+        return True
+
+    @staticmethod
+    def is_valid_pos(board, shape_key, rot_idx, pos_x, pos_y):
+        """Collision check by shape key (bitboard twin of TetrisCore.is_valid_pos)."""
+        masks = PIECE_MASKS[(shape_key, rot_idx)].get(int(pos_x))
+        if masks is None:
+            return False
+        return BitboardCore.fits(board, masks, int(pos_y), len(board))
+
+    @staticmethod
+    def is_valid_pos_fast(board, blocks, pos_x, pos_y, cols=COLUMNS, rows=ROWS):
+        """Collision check using a pre-fetched block list."""
+        masks = BitboardCore.masks_for(blocks).get(pos_x)
+        if masks is None:
+            return False
+        return BitboardCore.fits(board, masks, pos_y, rows)
+
+    @staticmethod
+    def drop_y(board, masks, pos_y, rows=ROWS):
+        """Landing Y for precomputed row masks, starting from pos_y."""
+        _fits = BitboardCore.fits
+        y = pos_y
+        while _fits(board, masks, y + 1, rows):
+            y += 1
+        return y
+
+    @staticmethod
+    def hard_drop_y(board, shape_key, rot_idx, pos_x, pos_y):
+        """Landing Y by shape key (bitboard twin of TetrisCore.hard_drop_y)."""
+        masks = PIECE_MASKS[(shape_key, rot_idx)][int(pos_x)]
+        return BitboardCore.drop_y(board, masks, int(pos_y), len(board))
+
+    @staticmethod
+    def hard_drop_y_fast(board, blocks, pos_x, pos_y, cols=COLUMNS, rows=ROWS):
+        """Landing Y using a pre-fetched block list."""
+        masks = BitboardCore.masks_for(blocks)[pos_x]
+        return BitboardCore.drop_y(board, masks, pos_y, rows)
+
+    @staticmethod
+    def lock_piece(board, shape_key, rot_idx, pos_x, pos_y):
+        """Lock a piece onto a COPY of the board and return it."""
+        new_board = board[:]
+        BitboardCore.lock_piece_mut(
+            new_board, TETROMINOS[shape_key]['rotations'][rot_idx],
+            int(pos_x), int(pos_y), COLUMNS, len(board)
+        )
+        return new_board
+
+    @staticmethod
+    def lock_piece_mut(board, blocks, pos_x, pos_y, cols=COLUMNS, rows=ROWS):
+        """
+        Lock a piece IN PLACE. Returns the (row, mask) pairs that were
+        written so they can be undone with unlock_piece_mut().
+        """
+        written = []
+        for dy, mask in BitboardCore.masks_for(blocks)[pos_x]:
+            r = pos_y + dy
+            if 0 <= r < rows:
+                board[r] |= mask
+                written.append((r, mask))
+        return written
+
+    @staticmethod
+    def unlock_piece_mut(board, written_rows):
+        """Undo a lock_piece_mut() by clearing the written bits."""
+        for r, mask in written_rows:
+            board[r] &= ~mask
+
+    @staticmethod
+    def clear_lines(board):
+        """Remove full rows. Returns (new_board, lines_cleared) without mutating."""
+        kept = [bits for bits in board if bits != FULL_ROW]
+        lines_cleared = len(board) - len(kept)
+        if lines_cleared == 0:
+            return board, 0
+        return [0] * lines_cleared + kept, lines_cleared
+
+    @staticmethod
+    def clear_lines_mut(board, cols=COLUMNS, rows=ROWS):
+        """Remove full rows IN PLACE. Returns the number of lines cleared."""
+        kept = [bits for bits in board if bits != FULL_ROW]
+        lines_cleared = rows - len(kept)
+        if lines_cleared:
+            board[:] = [0] * lines_cleared + kept
+        return lines_cleared
+
+    @staticmethod
+    def count_cleared_lines(board, blocks, pos_x, pos_y, rows=ROWS):
+        """Count rows the piece would complete, without mutating the board."""
+        count = 0
+        for dy, mask in BitboardCore.masks_for(blocks)[pos_x]:
+            r = pos_y + dy
+            if 0 <= r < rows and board[r] | mask == FULL_ROW:
+                count += 1
+        return count
+
+    @staticmethod
+    def is_game_over(board, shape_key, rot_idx, pos_x, pos_y):
+        """True if the piece at spawn overlaps an occupied visible cell."""
+        masks = PIECE_MASKS[(shape_key, rot_idx)].get(int(pos_x), ())
+        rows = len(board)
+        for dy, mask in masks:
+            r = int(pos_y) + dy
+            if 0 <= r < rows and board[r] & mask:
+                return True
+        return False
+
+    @staticmethod
+    def pack(board, cols=COLUMNS):
+        """Whole board as one int (row 0 in the highest bits) — an exact hash key."""
+        key = 0
+        for bits in board:
+            key = key << cols | bits
+        return key
+
+    @staticmethod
+    def unpack(key, rows=ROWS, cols=COLUMNS):
+        """Inverse of pack(): per-row bitboard from one int."""
+        return [(key >> ((rows - 1 - r) * cols)) & FULL_ROW for r in range(rows)]
+
+    @staticmethod
+    def column_heights(board, cols=COLUMNS, rows=ROWS):
+        """Height of every column (0 = empty column)."""
+        heights = [0] * cols
+        seen = 0
+        for r, bits in enumerate(board):
+            new = bits & ~seen
+            if new:
+                for c in range(cols):
+                    if new >> c & 1:
+                        heights[c] = rows - r
+                seen |= new
+                if seen == FULL_ROW:
+                    break
+        return heights
+
+    @staticmethod
+    def evaluate_all_placements(board, shape_key, spawn_y=-1,
+                                cols=COLUMNS, rows=ROWS):
+        """
+        Bitboard twin of TetrisCore.evaluate_all_placements().
+
+        Returns:
+            List of (rot_idx, x, drop_y, blocks) tuples, in the same order
+            as the list-of-lists version.
+        """
+        rotations = TETROMINOS[shape_key]['rotations']
+        max_rot = 1 if shape_key == 'O' else 4
+        _fits = BitboardCore.fits
+        placements = []
+
+        for rot in range(max_rot):
+            blocks = rotations[rot]
+            min_by = min(by for _, by in blocks)
+            for x, masks in PIECE_MASKS[(shape_key, rot)].items():
+                if not _fits(board, masks, spawn_y, rows):
+                    continue
+                y = spawn_y
+                while _fits(board, masks, y + 1, rows):
+                    y += 1
+                # All blocks must be on the visible grid (y >= 0)
+                if y + min_by < 0:
+                    continue
+                placements.append((rot, x, y, blocks))
+
+        return placements
+
+    @staticmethod
+    @lru_cache(maxsize=PLACEMENT_CACHE_SIZE)
+    def placements_for_heights(heights, shape_key, spawn_y=-1, rows=ROWS):
+        """
+        Straight-drop placements computed from the column heights alone.
+
+        With drops restricted to straight falls from spawn_y, the landing
+        row for each (rot, x) depends only on the top surface, so results
+        are memoized on the height profile and shared by every board (and
+        every game in the process) with the same surface.
+
+        Matches evaluate_all_placements() except when covered holes reach
+        the spawn rows, where the surface view is slightly conservative.
+
+        Args:
+            heights: Tuple of column heights (must be hashable)
+            shape_key: Tetromino name
+            spawn_y: Y position where pieces spawn (default -1)
+
+        Returns:
+            Tuple of (rot_idx, x, drop_y, blocks) in evaluate_all_placements() order.
+        """
+        rotations = TETROMINOS[shape_key]['rotations']
+        max_rot = 1 if shape_key == 'O' else 4
+        placements = []
+
+        for rot in range(max_rot):
+            blocks = rotations[rot]
+            min_by = min(by for _, by in blocks)
+            for x, bottoms in _PIECE_BOTTOMS[(shape_key, rot)]:
+                y = min(rows - heights[c] - 1 - by for c, by in bottoms)
+                if y < spawn_y or y + min_by < 0:
+                    continue
+                key = (shape_key, rot, x, y)
+                placement = _PLACEMENTS.get(key)
+                if placement is None:
+                    placement = _PLACEMENTS[key] = (rot, x, y, blocks)
+                placements.append(placement)
+
+        return tuple(placements)
+
+
+# ----------------------------------------------------------------------
+# Incremental board state — lock / evaluate / undo without grid copies
+# ----------------------------------------------------------------------
+class BoardState:
+    """
+    Bitboard plus incrementally maintained features, with an undo stack.
+
+    push() locks a piece, clear_lines() removes completed rows and pop()
+    reverts the most recent push together with any clear performed after
+    it. Column heights, per-row and per-column fill counts, aggregate
+    height and hole count are kept up to date on every step, so searches
+    can do lock -> evaluate -> undo without rebuilding anything.
+    """
+
+    __slots__ = ('board', 'heights', 'row_fill', 'col_fill', 'cells',
+                 'agg_height', 'holes', 'cols', 'rows', '_undo')
+
+    def __init__(self, board=None, cols=COLUMNS, rows=ROWS):
+        self.cols = cols
+        self.rows = rows
+        self.board = list(board) if board is not None else [0] * rows
+        self.row_fill = [bin(bits).count('1') for bits in self.board]
+        self.col_fill = [0] * cols
+        for bits in self.board:
+            for c in range(cols):
+                if bits >> c & 1:
+                    self.col_fill[c] += 1
+        self.heights = BitboardCore.column_heights(self.board, cols, rows)
+        self.cells = sum(self.row_fill)
+        self.agg_height = sum(self.heights)
+        self.holes = self.agg_height - self.cells
+        self._undo = []
+
+    @classmethod
+    def from_grid(cls, grid):
+        """Build a state from a 2D integer grid (or a bitboard)."""
+        cols = COLUMNS if isinstance(grid[0], int) else len(grid[0])
+        return cls(BitboardCore.from_grid(grid), cols, len(grid))
+
+    def push(self, blocks, pos_x, pos_y):
+        """
+        Lock a piece IN PLACE and record an undo frame.
+
+        Returns:
+            Number of rows the piece completed (not yet cleared).
+        """
+        board = self.board
+        heights = self.heights
+        rows = self.rows
+        written = []
+        completed = 0
+        old_heights = heights[:]
+        for bx, by in blocks:
+            cx = pos_x + bx
+            cy = pos_y + by
+            if 0 <= cy < rows:
+                board[cy] |= 1 << cx
+                self.row_fill[cy] += 1
+                self.col_fill[cx] += 1
+                if self.row_fill[cy] == self.cols:
+                    completed += 1
+                if rows - cy > heights[cx]:
+                    heights[cx] = rows - cy
+                written.append((cx, cy))
+        self.cells += len(written)
+        old_agg, old_holes = self.agg_height, self.holes
+        self.agg_height = sum(heights)
+        self.holes = self.agg_height - self.cells
+        self._undo.append([written, old_heights, old_agg, old_holes, None])
+        return completed
+
+    def clear_lines(self):
+        """
+        Remove full rows IN PLACE. The clear is attached to the current
+        undo frame, so the next pop() restores the rows as well.
+
+        Returns:
+            Number of lines cleared.
+        """
+        cols, rows = self.cols, self.rows
+        full = [r for r in range(rows) if self.row_fill[r] == cols]
+        if not full:
+            return 0
+        lines = len(full)
+        self._undo[-1][4] = (self.board, self.row_fill, self.heights,
+                             self.col_fill, self.cells, self.agg_height, self.holes)
+
+        keep = [r for r in range(rows) if self.row_fill[r] != cols]
+        self.board = [0] * lines + [self.board[r] for r in keep]
+        self.row_fill = [0] * lines + [self.row_fill[r] for r in keep]
+        self.col_fill = [f - lines for f in self.col_fill]
+        self.cells -= lines * cols
+
+        # Columns topping out above every cleared row just sink; any column
+        # whose top was inside the cleared band is rescanned.
+        first = full[0]
+        board = self.board
+        heights = self.heights[:]
+        for c in range(cols):
+            if rows - heights[c] < first:
+                heights[c] -= lines
+            else:
+                h = 0
+                bit = 1 << c
+                for r in range(rows):
+                    if board[r] & bit:
+                        h = rows - r
+                        break
+                heights[c] = h
+        self.heights = heights
+        self.agg_height = sum(heights)
+        self.holes = self.agg_height - self.cells
+        return lines
+
+    def pop(self):
+        """Undo the most recent push() (and its line clear, if any)."""
+        written, old_heights, old_agg, old_holes, cleared = self._undo.pop()
+        if cleared is not None:
+            (self.board, self.row_fill, self.heights,
+             self.col_fill, self.cells, _, _) = cleared
+        board = self.board
+        for cx, cy in written:
+            board[cy] &= ~(1 << cx)
+            self.row_fill[cy] -= 1
+            self.col_fill[cx] -= 1
+        self.cells -= len(written)
+        self.heights = old_heights
+        self.agg_height = old_agg
+        self.holes = old_holes
+
+    def key(self):
+        """Packed board (BitboardCore.pack) for transposition lookups."""
+        return BitboardCore.pack(self.board, self.cols)
+
+    def features(self):
+        """
+        Heuristic features of the current board.
+
+        Same tuple as evaluator.compute_board_features():
+            (agg_height, holes, blockades, bumpiness, almost_full,
+            well_col, well_depth, heights)
+        """
+        cols, rows = self.cols, self.rows
+        heights = self.heights
+
+        # A cell is a blockade when any empty cell sits above it; only a
+        # column filled solid from row 0 down has cells that are not.
+        solid = 0
+        top = self.board[0]
+        if top:
+            for c in range(cols):
+                bit = 1 << c
+                if top & bit:
+                    for bits in self.board:
+                        if not bits & bit:
+                            break
+                        solid += 1
+        blockades = self.cells - solid
+
+        bumpiness = 0
+        for i in range(cols - 1):
+            bumpiness += abs(heights[i] - heights[i + 1])
+
+        almost_full = 0
+        lo = cols - 2
+        for f in self.row_fill:
+            if lo <= f < cols:
+                almost_full += 1
+
+        max_well_depth = 0
+        well_col = -1
+        for c in range(cols):
+            left = heights[c - 1] if c > 0 else rows
+            right = heights[c + 1] if c < cols - 1 else rows
+            wd = min(left, right) - heights[c]
+            if wd > max_well_depth:
+                max_well_depth = wd
+                well_col = c
+
+        return (
+            self.agg_height,
+            self.holes,
+            blockades,
+            bumpiness,
+            almost_full,
+            well_col,
+            max_well_depth,
+            heights,
+        )
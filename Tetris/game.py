@@ -1,35 +1,26 @@
 from settings import *
 from timers import Timer
-from core import TetrisCore
+from core import FULL_ROW, BitboardCore, TetrisCore
 
 class Game: 
     def __init__(self, get_next_shape, update_score, get_held_shape, initial_shape,
-                ai_class=None, ai_kwargs=None):
-        self.surface = pygame.Surface((GAME_WIDTH, GAME_HEIGHT))
-        self.display_surface = pygame.display.get_surface()
-        self.rect = self.surface.get_rect(topleft = (PADDING+SIDEBAR_WIDTH+PADDING, PADDING))
-
-        self.bg_surface = pygame.Surface((GAME_WIDTH, GAME_HEIGHT))
-        self.bg_surface.fill(GRAY)
-
-        self.line_surface = self.surface.copy()
-        self.line_surface.fill((0,255,0))
-        self.line_surface.set_colorkey((0,255,0))
-        self.line_surface.set_alpha(120)
-        
-        # Bake grid lines once
-        for col in range(1, COLUMNS):
-            x = col * CELL_SIZE
-            pygame.draw.line(self.line_surface, LINE_COLOR, (x, 0), (x, self.surface.get_height()), 1)
-        for row in range(1, ROWS):
-            y = row * CELL_SIZE
-            pygame.draw.line(self.line_surface, LINE_COLOR, (0, y), (self.surface.get_width(), y), 1)
+                ai_class=None, ai_kwargs=None, render=True, sim_clock=None,
+                replay=None):
+        # render=False: no Surfaces, no drawing — game logic only
+        self.render = render
+        self.surface = None
+        self.display_surface = None
+        self.bg_surface = None
+        self.line_surface = None
+        if render:
+            self._init_surfaces()
 
         self.drop_speed = UPDATE_START_SPEED
         self.fast_drop_speed = UPDATE_START_SPEED * 0.1
         self.is_fast_drop = False
         self.hard_drop_in_progress = False
 
+        self.replay = replay    # replay.Replay being recorded, or None
         self.get_next_shape = get_next_shape
         self.get_held_shape = get_held_shape
         self.update_score = update_score
@@ -44,15 +35,21 @@ class Game:
         self.num_tetris = 0
 
         self.game_data = [[0 for x in range(COLUMNS)] for y in range(ROWS)]
+        # Occupancy mirror of game_data: one bitmask per row (bit x = column x),
+        # the BitboardCore format the AI and workers search on
+        self.board = [0] * ROWS
         self.tetromino = Tetrominos(
             initial_shape,
             self.game_data
         )
+        # Clock for timers and AI pacing: wall time, or a timers.SimClock
+        self.sim_clock = sim_clock
+        self.get_ticks = sim_clock if sim_clock is not None else pygame.time.get_ticks
         self.timerss= {
-            'vertical move':  Timer(UPDATE_START_SPEED, True, self.move_down),
-            'horizontal move': Timer(DAS_DELAY),
-            'rotate': Timer(ROTATE_WAIT_TIME),
-            'lock delay': Timer(LOCK_DELAY_TIME, False, self.lock_tetromino)
+            'vertical move':  Timer(UPDATE_START_SPEED, True, self.move_down, self.get_ticks),
+            'horizontal move': Timer(DAS_DELAY, clock=self.get_ticks),
+            'rotate': Timer(ROTATE_WAIT_TIME, clock=self.get_ticks),
+            'lock delay': Timer(LOCK_DELAY_TIME, False, self.lock_tetromino, self.get_ticks)
         }
         self.timerss['vertical move'].activate()
 
@@ -63,6 +60,8 @@ class Game:
         self.current_level = 1
         self.current_lines = 0
         self.current_next_shape = None  # <-- Set by Main after each get_next_shape()
+        self.current_next_shapes = None # <-- Full preview queue, also set by Main
+        self.current_bag = None         # <-- Pieces left in the 7-bag, also set by Main
         
         # Configurable AI
         if ai_class is None:
@@ -72,6 +71,64 @@ class Game:
         
         self.is_game_over = False
 
+    def _init_surfaces(self):
+        self.surface = pygame.Surface((GAME_WIDTH, GAME_HEIGHT))
+        self.display_surface = pygame.display.get_surface()
+        self.rect = self.surface.get_rect(topleft = (PADDING+SIDEBAR_WIDTH+PADDING, PADDING))
+
+        self.bg_surface = pygame.Surface((GAME_WIDTH, GAME_HEIGHT))
+        self.bg_surface.fill(GRAY)
+
+        self.line_surface = self.surface.copy()
+        self.line_surface.fill((0,255,0))
+        self.line_surface.set_colorkey((0,255,0))
+        self.line_surface.set_alpha(120)
+        
+        # Bake grid lines once
+        for col in range(1, COLUMNS):
+            x = col * CELL_SIZE
+            pygame.draw.line(self.line_surface, LINE_COLOR, (x, 0), (x, self.surface.get_height()), 1)
+        for row in range(1, ROWS):
+            y = row * CELL_SIZE
+            pygame.draw.line(self.line_surface, LINE_COLOR, (0, y), (self.surface.get_width(), y), 1)
+
+        # Pre-rendered cell sprites: one solid block per color, one ghost outline
+        self.block_sprites = {}
+        self.ghost_sprite = pygame.Surface((CELL_SIZE, CELL_SIZE))
+        self.ghost_sprite.fill((0,255,0))
+        self.ghost_sprite.set_colorkey((0,255,0))
+        pygame.draw.rect(self.ghost_sprite, (200, 200, 200), (0, 0, CELL_SIZE, CELL_SIZE), 2)
+
+        # Incremental redraw state (see draw())
+        self._drawn_key = None
+        self._drawn_ghost = set()
+        self._drawn_piece = set()
+        self._drawn_color = None
+        self._baked_cells = set()    # Locked since the last draw()
+        self._full_redraw = True
+        self.dirty_rects = []
+
+    def block_sprite(self, color):
+        sprite = self.block_sprites.get(color)
+        if sprite is None:
+            sprite = pygame.Surface((CELL_SIZE, CELL_SIZE))
+            sprite.fill(color)
+            self.block_sprites[color] = sprite
+        return sprite
+
+    def set_board(self, game_data):
+        """Replace every locked cell (Main.restore()); the board is redrawn in full."""
+        self.game_data = game_data
+        self.board = [sum(1 << x for x, cell in enumerate(row) if cell) for row in game_data]
+        if self.render:
+            self.bg_surface.fill(GRAY)
+            for y, row in enumerate(game_data):
+                for x, cell in enumerate(row):
+                    if cell:
+                        self.bg_surface.blit(self.block_sprite(cell), (x * CELL_SIZE, y * CELL_SIZE))
+            self._baked_cells.clear()
+            self._full_redraw = True
+
     def calculate_score(self, lines_cleared):
         self.current_lines += lines_cleared
         self.current_score += SCORE_DATA[lines_cleared] * self.current_level
@@ -93,6 +150,8 @@ class Game:
 
     def hold_piece(self):
         if not self.is_held:
+            if self.replay is not None:
+                self.replay.hold()
             if self.held_piece is None:
                 self.held_piece = self.tetromino.shape
                 new_shape = self.get_next_shape()
@@ -208,25 +267,25 @@ class Game:
             self.hold_piece()
  
     def check_finished_rows(self):
-        delete_rows = [i for i, row in enumerate(self.game_data) if all(row)]
+        delete_rows = [i for i, bits in enumerate(self.board) if bits == FULL_ROW]
         if not delete_rows:
             return
 
         lines = len(delete_rows)
-        
-        # New rebuild logic for color-based game_data
-        new_game_data = [[0 for _ in range(COLUMNS)] for _ in range(lines)]
-        for i, row in enumerate(self.game_data):
-            if i not in delete_rows:
-                new_game_data.append(row[:])
-        self.game_data = new_game_data
-
-        # Re-bake the bg_surface
-        self.bg_surface.fill(GRAY)
-        for y, row in enumerate(self.game_data):
-            for x, color in enumerate(row):
-                if color != 0:
-                    pygame.draw.rect(self.bg_surface, color, (x * CELL_SIZE, y * CELL_SIZE, CELL_SIZE, CELL_SIZE))
+
+        # Drop full rows from both grids, empty rows on top
+        self.game_data = [[0 for _ in range(COLUMNS)] for _ in range(lines)] + [
+            row for row, bits in zip(self.game_data, self.board) if bits != FULL_ROW
+        ]
+        self.board = [0] * lines + [bits for bits in self.board if bits != FULL_ROW]
+
+        # Scroll the bg_surface down over each cleared row (top to bottom)
+        if self.render:
+            for row in delete_rows:
+                above = self.bg_surface.subsurface((0, 0, GAME_WIDTH, (row + 1) * CELL_SIZE))
+                above.scroll(0, CELL_SIZE)
+                self.bg_surface.fill(GRAY, (0, 0, GAME_WIDTH, CELL_SIZE))
+            self._full_redraw = True
 
         if lines == 1:
             self.num_1line += 1
@@ -242,6 +301,11 @@ class Game:
         px = int(self.tetromino.pivot.x)
         py = int(self.tetromino.pivot.y)
         cells = TetrisCore.get_piece_cells(self.tetromino.shape, self.tetromino.rotation_index, px, py)
+        if self.replay is not None:
+            rot = self.tetromino.rotation_index
+            blocks = TETROMINOS[self.tetromino.shape]['rotations'][rot]
+            drop_y = BitboardCore.hard_drop_y_fast(self.board, blocks, px, int(BLOCK_OFFSET.y))
+            self.replay.lock(rot, px, None if py == drop_y else py)
         
         is_completely_above = True
         for x, y in cells:
@@ -249,8 +313,11 @@ class Game:
                 is_completely_above = False
             if 0 <= x < COLUMNS and 0 <= y < ROWS:
                 self.game_data[y][x] = self.tetromino.color
+                self.board[y] |= 1 << x
                 # Bake to bg_surface
-                pygame.draw.rect(self.bg_surface, self.tetromino.color, (x * CELL_SIZE, y * CELL_SIZE, CELL_SIZE, CELL_SIZE))
+                if self.render:
+                    self.bg_surface.blit(self.block_sprite(self.tetromino.color), (x * CELL_SIZE, y * CELL_SIZE))
+                    self._baked_cells.add((x, y))    # Repaint on the next draw()
         
         if is_completely_above:
             self.is_game_over = True
@@ -269,8 +336,17 @@ class Game:
         self.ai.update(
             next_shape=self.current_next_shape,
             held_piece=self.held_piece,
-            is_held=self.is_held
+            is_held=self.is_held,
+            next_shapes=self.current_next_shapes,
+            bag=self.current_bag
         )
+        if self.sim_clock is not None:
+            # Simulated time stands still while the AI waits for its
+            # workers, as their latency is a fraction of a real frame
+            # (SimClock.hold() gives up only on a dead worker).
+            if self.sim_clock.hold(self.ai):
+                return
+            self.sim_clock.advance()    # One simulated frame per run()
         self.timers_update()
 
         # --- Collision detection ---
@@ -288,25 +364,64 @@ class Game:
                 self.timerss['lock delay'].deactivate()
                 self.lock_timer_active = False
 
-        self.surface.fill(GRAY)
-        self.surface.blit(self.bg_surface, (0, 0))
-
-        ghost_positions = self.tetromino.get_ghost_positions()
-        for x, y in ghost_positions:
-            if y >= 0:
-                pygame.draw.rect(self.surface, (200, 200, 200), (x * CELL_SIZE, y * CELL_SIZE, CELL_SIZE, CELL_SIZE), 2)
-            
-        # Draw active piece
-        px = int(self.tetromino.pivot.x)
-        py = int(self.tetromino.pivot.y)
-        cells = TetrisCore.get_piece_cells(self.tetromino.shape, self.tetromino.rotation_index, px, py)
-        for x, y in cells:
-            if y >= 0: # Only draw if on screen
-                pygame.draw.rect(self.surface, self.tetromino.color, (x * CELL_SIZE, y * CELL_SIZE, CELL_SIZE, CELL_SIZE))
-
-        self.draw_grid()
-
-        self.display_surface.blit(self.surface, self.rect.topleft)
+        if self.render:
+            self.draw()
+
+    def draw(self):
+        """
+        Incremental redraw. Only cells whose ghost / active-piece state
+        changed since the last frame are repainted (background, sprite,
+        grid) and copied to the screen; their screen rects are left in
+        self.dirty_rects for pygame.display.update(rects). The whole board
+        is redrawn on the first frame and after a line clear.
+        """
+        self.dirty_rects = []
+        tetromino = self.tetromino
+        px = int(tetromino.pivot.x)
+        py = int(tetromino.pivot.y)
+        key = (id(tetromino), tetromino.shape, tetromino.rotation_index, px, py)
+        if key == self._drawn_key and not self._full_redraw and not self._baked_cells:
+            return    # Nothing changed: board, ghost and piece are already on screen
+        self._drawn_key = key
+
+        cells = TetrisCore.get_piece_cells(tetromino.shape, tetromino.rotation_index, px, py)
+        piece = {(x, y) for x, y in cells if y >= 0}    # Only draw if on screen
+        ghost = {(x, y) for x, y in tetromino.get_ghost_positions() if y >= 0} - piece
+
+        if self._full_redraw:
+            self._full_redraw = False
+            self.surface.blit(self.bg_surface, (0, 0))
+            for x, y in ghost:
+                self.surface.blit(self.ghost_sprite, (x * CELL_SIZE, y * CELL_SIZE))
+            for x, y in piece:
+                self.surface.blit(self.block_sprite(tetromino.color), (x * CELL_SIZE, y * CELL_SIZE))
+            self.draw_grid()
+            self.display_surface.blit(self.surface, self.rect.topleft)
+            self.dirty_rects.append(self.rect.copy())
+        else:
+            if tetromino.color != self._drawn_color:
+                changed = self._drawn_ghost | self._drawn_piece | ghost | piece
+            else:
+                changed = ((self._drawn_ghost ^ ghost) | (self._drawn_piece ^ piece)
+                           | (self._drawn_ghost & piece) | (self._drawn_piece & ghost))
+            changed |= self._baked_cells
+            sprite = self.block_sprite(tetromino.color)
+            for x, y in changed:
+                cell = pygame.Rect(x * CELL_SIZE, y * CELL_SIZE, CELL_SIZE, CELL_SIZE)
+                self.surface.blit(self.bg_surface, cell, cell)
+                if (x, y) in piece:
+                    self.surface.blit(sprite, cell)
+                elif (x, y) in ghost:
+                    self.surface.blit(self.ghost_sprite, cell)
+                self.surface.blit(self.line_surface, cell, cell)
+                screen = cell.move(self.rect.topleft)
+                self.display_surface.blit(self.surface, screen, cell)
+                self.dirty_rects.append(screen)
+
+        self._drawn_ghost = ghost
+        self._drawn_piece = piece
+        self._drawn_color = tetromino.color
+        self._baked_cells.clear()
         pygame.draw.rect(self.display_surface, LINE_COLOR, self.rect, 2, 2)
 
 
@@ -0,0 +1,182 @@
+"""
+Headless Game Simulator — No Pygame Surfaces, No Timers
+
+Pure game-rules simulation built on TetrisCore: 7-bag piece generation
+(same RNG sequence as Main for a given seed), 3-piece preview, hold,
+line clears and scoring. Each step() places exactly one piece, so a game
+runs as fast as the CPU allows instead of being paced by the frame clock.
+
+The AI decision mirrors TetrisAI's SYNC path: find_best_move_for_mode()
+(hold-aware 1-step lookahead by default, or beam / expectimax / anytime
+search over the preview and bag) picks play vs. hold, and after a hold the
+new piece is re-evaluated with hold locked out. Pieces are placed directly at the
+chosen (rot, x) with a straight drop from spawn.
+
+Time is measured in pieces. time_sec converts the piece count to
+simulated seconds at SECONDS_PER_PIECE so the GA fitness function keeps
+its real-time scale.
+"""
+
+import os
+import random
+import sys
+
+from settings import (
+    BLOCK_OFFSET, COLUMNS, ROWS, SCORE_DATA, TETROMINOS,
+    create_7bag, get_next_tetromino,
+)
+from core import TetrisCore
+from replay import Replay
+
+# Ensure project root is importable (for AI.evaluator)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from AI.evaluator import (
+    BEAM_WIDTH, EXPECTIMAX_TIME_LIMIT, SEARCH_LOOKAHEAD, find_best_move_for_mode,
+)
+
+# Nominal pace of the GA agent in the real-time game: the 130 ms action
+# throttle plus a few frames of movement per piece.
+SECONDS_PER_PIECE = 0.15
+
+_DEFAULT_WEIGHTS = [1.275, 4.0, 1.2, 0.8, 0.5, 3.0, 20, 5, 2, 0.1]
+_SPAWN_X = int(BLOCK_OFFSET.x)
+_SPAWN_Y = int(BLOCK_OFFSET.y)
+
+
+class HeadlessGame:
+    """
+    One AI-driven Tetris game with no rendering and no wall clock.
+
+    Exposes the same stats the GA reads from Main/Game: lines, score,
+    level, num_1line, num_2line, num_3line, num_tetris, plus pieces and
+    time_sec.
+    """
+
+    def __init__(self, seed=None, weights=None, search_mode=SEARCH_LOOKAHEAD,
+                 beam_width=BEAM_WIDTH, time_limit=EXPECTIMAX_TIME_LIMIT, record=False):
+        if seed is None:
+            seed = random.SystemRandom().randrange(1 << 62)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.weights = list(weights) if weights is not None else _DEFAULT_WEIGHTS
+        self.search_mode = search_mode
+        self.beam_width = beam_width
+        self.time_limit = time_limit
+        self.replay = Replay(seed) if record else None    # Per-piece log (replay.py)
+
+        # Same draw order as Main: 3-piece preview, then the first piece
+        # is popped and the preview refilled.
+        self.bag = create_7bag(self.rng)
+        self.next_shapes = [get_next_tetromino(self.bag, self.rng) for _ in range(3)]
+        self.shape = self.next_shapes.pop(0)
+        self.next_shapes.append(get_next_tetromino(self.bag, self.rng))
+
+        self.grid = TetrisCore.create_grid()
+        self.held_piece = None
+        self.is_held = False
+        self.is_game_over = False
+
+        self.pieces = 0
+        self.lines = 0
+        self.score = 0
+        self.level = 1
+        self.num_1line = 0
+        self.num_2line = 0
+        self.num_3line = 0
+        self.num_tetris = 0
+
+    @property
+    def time_sec(self):
+        """Simulated seconds survived."""
+        return int(self.pieces * SECONDS_PER_PIECE)
+
+    def get_next_shape(self):
+        next_piece = self.next_shapes.pop(0)
+        self.next_shapes.append(get_next_tetromino(self.bag, self.rng))
+        self.is_held = False
+        return next_piece
+
+    def hold_piece(self):
+        """Same rules as Game.hold_piece()."""
+        if self.is_held:
+            return
+        if self.replay is not None:
+            self.replay.hold()
+        if self.held_piece is None:
+            self.held_piece = self.shape
+            self.shape = self.get_next_shape()
+        else:
+            self.shape, self.held_piece = self.held_piece, self.shape
+        self.is_held = True
+
+    def decide(self):
+        """Return (rot, x, should_hold) for the current piece, or None."""
+        return find_best_move_for_mode(
+            self.search_mode, self.grid, [self.shape] + self.next_shapes,
+            self.held_piece, self.is_held, self.weights,
+            self.bag, self.beam_width, self.time_limit
+        )
+
+    def step(self):
+        """
+        Place one piece (holding first if the AI prefers it).
+
+        Returns:
+            False once the game is over, True otherwise.
+        """
+        if self.is_game_over:
+            return False
+
+        move = self.decide()
+        if move is not None and move[2]:
+            self.hold_piece()
+            move = self.decide()
+
+        if move is None:
+            # No reachable placement — let it fall where it spawned.
+            rot, x = 0, _SPAWN_X
+        else:
+            rot, x = move[0], move[1]
+
+        blocks = TETROMINOS[self.shape]['rotations'][rot]
+        drop_y = TetrisCore.hard_drop_y_fast(self.grid, blocks, x, _SPAWN_Y,
+                                             COLUMNS, ROWS)
+        if self.replay is not None:
+            self.replay.lock(rot, x)    # Always a straight drop
+        self.lock(blocks, x, drop_y)
+        return not self.is_game_over
+
+    def lock(self, blocks, x, y):
+        """Lock, clear, score and spawn the next piece (Game.lock_tetromino)."""
+        if all(y + by < 0 for _, by in blocks):
+            self.is_game_over = True
+            return
+
+        TetrisCore.lock_piece_mut(self.grid, blocks, x, y, COLUMNS, ROWS)
+        self.pieces += 1
+
+        lines = TetrisCore.clear_lines_mut(self.grid, COLUMNS, ROWS)
+        if lines:
+            if lines == 1:
+                self.num_1line += 1
+            elif lines == 2:
+                self.num_2line += 1
+            elif lines == 3:
+                self.num_3line += 1
+            elif lines == 4:
+                self.num_tetris += 1
+            self.lines += lines
+            self.score += SCORE_DATA[lines] * self.level
+
+        self.shape = self.get_next_shape()
+        if TetrisCore.is_game_over(self.grid, self.shape, 0, _SPAWN_X, _SPAWN_Y):
+            self.is_game_over = True
+
+    def run(self, max_pieces=None):
+        """Play until game over or max_pieces have been placed."""
+        while not self.is_game_over:
+            if max_pieces is not None and self.pieces >= max_pieces:
+                break
+            self.step()
+        return self
@@ -1,11 +1,15 @@
 # held.py
 from settings import *
-from os import path
-from pygame.image import load
+from render_cache import shape_images
 
 class Held:
-    def __init__(self):
+    def __init__(self, render=True):
         self.held_shape = None  # Initialize held shape to None
+        self.render = render
+        self.dirty = False        # Redrawn by the last run()
+        self._drawn = ()          # held_shape on screen (() = nothing yet)
+        if not render:
+            return    # Logic only: no Surfaces or images
         self.display_surface = pygame.display.get_surface()
 
         # Calculate the height for the Held surface
@@ -13,12 +17,8 @@ class Held:
         self.surface = pygame.Surface((SIDEBAR_WIDTH, held_height))  # Define the surface size
         self.rect = self.surface.get_rect(topleft=(PADDING, PADDING))  # Place at the top-left corner of the screen
 
-        # Load shape images
-        BASE_DIR = path.dirname(path.abspath(__file__))
-        self.shape_surfaces = {
-            shape: load(path.join(BASE_DIR, "assets", "graphics", f'{shape}.png')).convert_alpha()
-            for shape in TETROMINOS.keys()
-        }
+        # Shape images (loaded once per process)
+        self.shape_surfaces = shape_images()
 
         # Positioning settings for the held shape
         self.top_padding = 20  # Extra space at the top
@@ -39,8 +39,15 @@ class Held:
             shape_rect.topleft = (x, y)
             self.surface.blit(shape_surface, shape_rect)  # Blit the shape onto the surface
 
-    def run(self):
-        """Run the held shape display process."""
+    def run(self, force=False):
+        """Run the held shape display process (only when the held shape changed, or force)."""
+        self.dirty = False
+        if not self.render:
+            return
+        if not force and self.held_shape == self._drawn:
+            return
+        self._drawn = self.held_shape
+        self.dirty = True
         self.surface.fill(GRAY)  # Fill the surface with the gray background
         self.display_held()  # Call the function to display the held shape
         self.display_surface.blit(self.surface, self.rect)  # Blit the surface onto the main screen
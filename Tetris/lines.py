@@ -1,34 +1,45 @@
 from settings import *
-from os import path
+from render_cache import get_font, render_text
 
 class Lines:
-    def __init__(self):
-        self.display_surface = pygame.display.get_surface()
-        preview_height = GAME_HEIGHT * PREVIEW_HEIGHT_FRACTION
-        lines_height = GAME_HEIGHT - preview_height
-        
-        # Move to the left side
-        self.surface = pygame.Surface((SIDEBAR_WIDTH, lines_height))
-        self.rect = self.surface.get_rect(topleft=(PADDING, preview_height + PADDING))  # Moved to left
-
-        # Font
-        BASE_DIR = path.dirname(path.abspath(__file__))
-        self.font = pygame.font.Font(path.join(BASE_DIR, "assets", "graphics", "Russo_One.ttf"), 20)
-
-        # Increase spacing to push everything down a bit
-        self.top_padding = 30  # Increased padding to give more space at the top
-        self.increment_height = (self.surface.get_height() - self.top_padding) // 2  # Adjusted for 2 items
+    def __init__(self, render=True):
+        self.render = render
+        self.dirty = False     # Redrawn by the last run()
+        self._drawn = None     # (levels, lines) on screen
+        if render:
+            self.display_surface = pygame.display.get_surface()
+            preview_height = GAME_HEIGHT * PREVIEW_HEIGHT_FRACTION
+            lines_height = GAME_HEIGHT - preview_height
+
+            # Move to the left side
+            self.surface = pygame.Surface((SIDEBAR_WIDTH, lines_height))
+            self.rect = self.surface.get_rect(topleft=(PADDING, preview_height + PADDING))  # Moved to left
+
+            # Font (shared by every panel)
+            self.font = get_font(20)
+
+            # Increase spacing to push everything down a bit
+            self.top_padding = 30  # Increased padding to give more space at the top
+            self.increment_height = (self.surface.get_height() - self.top_padding) // 2  # Adjusted for 2 items
 
         # Data
         self.levels = 1
         self.lines = 0
 
     def display_text(self, pos, text):
-        text_surface = self.font.render(text, True, LINE_COLOR)
+        text_surface = render_text(self.font, text, LINE_COLOR)
         text_rect = text_surface.get_rect(center=pos)
         self.surface.blit(text_surface, text_rect)
 
-    def run(self):
+    def run(self, force=False):
+        """Redraw only when the level or line count changed (or force)."""
+        self.dirty = False
+        if not self.render:
+            return
+        if not force and (self.levels, self.lines) == self._drawn:
+            return
+        self._drawn = (self.levels, self.lines)
+        self.dirty = True
         self.surface.fill(GRAY) # Fill the surface with a background color
         # Display Level and Lines
         for i, (label, value) in enumerate([('Level', self.levels), ('Lines', self.lines)]):
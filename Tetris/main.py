@@ -8,17 +8,22 @@ import sys
 import multiprocessing
 
 # Components
-from game import Game
+from game import Game, Tetrominos
 from score import Score
 from lines import Lines
 from preview import Preview
 from held import Held
+from render_cache import get_font, render_text
+from snapshot import FLAGS, TIMER_NAMES, decode, encode
+from replay import Replay
 
 class Main:
-    def __init__(self, seed=None, use_async_ai=True, ai_class=None, ai_kwargs=None):
+    def __init__(self, seed=None, use_async_ai=True, ai_class=None, ai_kwargs=None,
+                 worker_pool=None, render=True, sim_clock=None, record=False):
         # ===== Per-Game RNG Isolation =====
         if seed is None:
             seed = time.time_ns() ^ os.getpid() ^ random.randint(0, 1_000_000)
+        self.seed = seed    # Kept for snapshot()
         self.rng = random.Random(seed)
         rng_check = random.Random(seed).random()
         print(f"[PID {os.getpid()}] Using seed: {seed} | RNG check: {rng_check}")
@@ -27,8 +32,16 @@ class Main:
         # ==== UNCOMMENT FOR NORMAL/STANDALONE MODE ====
         pygame.init()
         
+        # render=False: game logic only — no window, Surfaces, fonts or audio
+        self.render = render
+        # sim_clock (timers.SimClock): game time advances one frame per
+        # game.run() instead of following the wall clock
+        self.sim_clock = sim_clock
+        # record=True: self.replay logs every piece (replay.py)
+        self.replay = Replay(seed) if record else None
+
         # --- AUDIO INITIALIZATION ---
-        if os.environ.get("SDL_VIDEODRIVER") != "dummy":
+        if render and os.environ.get("SDL_VIDEODRIVER") != "dummy":
             try:
                 pygame.mixer.init()
                 # Try multiple extensions in case user downloads wav, mp3, or ogg
@@ -50,20 +63,23 @@ class Main:
                 print(f"[Audio] Warning: Could not initialize or play BGM - {e}")
         # ----------------------------
 
-        self.display_surface = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+        self.display_surface = None
+        if render:
+            self.display_surface = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+            pygame.display.set_caption("TETRIS")
         self.clock = pygame.time.Clock()
-        pygame.display.set_caption("TETRIS")
         # ===============================================
 
         # Piece bag and preview queue
         self.bag = create_7bag(self.rng)
         print(f"[PID {os.getpid()}] Initial bag: {self.bag}")  # Debug: log bag order
-        self.next_shapes = [get_next_tetromino(self.bag, self.rng) for _ in range(3)]
+        self.pieces_drawn = 0    # Bag draws so far, preview included (see snapshot.py)
+        self.next_shapes = [self._draw_piece() for _ in range(3)]
 
         # Pop the first shape for the initial tetromino (can't use get_next_shape
         # yet because self.game doesn't exist until Game.__init__ returns)
         initial_shape = self.next_shapes.pop(0)
-        self.next_shapes.append(get_next_tetromino(self.bag, self.rng))
+        self.next_shapes.append(self._draw_piece())
 
         # ---- Phase 7: Dual-Worker Hold + 2-Step Lookahead ----
         self._play_process = None      # Worker A: "play current piece"
@@ -71,7 +87,16 @@ class Main:
         self._play_conn = None
         self._hold_conn = None
 
-        if use_async_ai:
+        if use_async_ai and worker_pool is not None:
+            # Shared pool (AI/worker_pool.py) — no processes of our own
+            ai_kwargs = ai_kwargs or {}
+            self._play_conn, self._hold_conn = worker_pool.connect(
+                ai_kwargs.get('weights', None)
+            )
+            ai_kwargs['play_pipe'] = self._play_conn
+            ai_kwargs['hold_pipe'] = self._hold_conn
+
+        elif use_async_ai:
             # Import worker function
             sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
             from AI.worker import run_ai_worker
@@ -104,13 +129,16 @@ class Main:
         # Game and UI components
         self.game = Game(
             self.get_next_shape, self.update_score, self.get_held_shape,
-            initial_shape, ai_class=ai_class, ai_kwargs=ai_kwargs
+            initial_shape, ai_class=ai_class, ai_kwargs=ai_kwargs, render=render,
+            sim_clock=sim_clock, replay=self.replay
         )
-        self.score = Score()
-        self.lines = Lines()
-        self.held = Held()
-        self.preview = Preview()
+        self.score = Score(render, sim_clock)
+        self.lines = Lines(render)
+        self.held = Held(render)
+        self.preview = Preview(render)
         self.game.current_next_shape = self.next_shapes[0]
+        self.game.current_next_shapes = tuple(self.next_shapes)
+        self.game.current_bag = tuple(self.bag)
 
 
     def update_score(self, lines, score, levels):
@@ -119,48 +147,163 @@ class Main:
         self.lines.lines = lines
         self.lines.levels = levels
 
+    def _draw_piece(self):
+        self.pieces_drawn += 1
+        return get_next_tetromino(self.bag, self.rng)
+
     def get_next_shape(self):
         next_piece = self.next_shapes.pop(0)
-        self.next_shapes.append(get_next_tetromino(self.bag, self.rng))
+        self.next_shapes.append(self._draw_piece())
         self.game.is_held = False
         self.game.current_next_shape = self.next_shapes[0]
+        self.game.current_next_shapes = tuple(self.next_shapes)
+        self.game.current_bag = tuple(self.bag)
 
         return next_piece
 
     def get_held_shape(self, shape):
         self.held.held_shape = shape
 
+    def snapshot(self):
+        """
+        The game state as a few hundred bytes (format in snapshot.py):
+        board, active piece, hold, bag position, counters and timers.
+        AI search state is not included; restore() starts a fresh search.
+        """
+        game = self.game
+        now = game.get_ticks()
+        tetromino = game.tetromino
+        ai_last = getattr(game.ai, 'last_action_time', None)
+        state = {
+            'seed': self.seed,
+            'pieces_drawn': self.pieces_drawn,
+            'shape': tetromino.shape,
+            'rotation': tetromino.rotation_index,
+            'x': int(tetromino.pivot.x),
+            'y': int(tetromino.pivot.y),
+            'held': game.held_piece,
+            'move_dir': game.current_move_dir,
+            'lock_move_count': game.lock_move_count,
+            'score': game.current_score,
+            'lines': game.current_lines,
+            'level': game.current_level,
+            'line_clears': (game.num_1line, game.num_2line, game.num_3line, game.num_tetris),
+            'elapsed_ms': round((self.score.now() - self.score.start_time) * 1000),
+            'frozen_time': self.score.frozen_time,
+            'ai_idle_ms': None if ai_last is None else min(now - ai_last, 2**31 - 1),
+            'timers': tuple(
+                (timer.active, now - timer.start_time if timer.started else None,
+                 timer.duration)
+                for timer in (game.timerss[name] for name in TIMER_NAMES)
+            ),
+            'cells': game.game_data,
+        }
+        for name in FLAGS:
+            state[name] = getattr(game, name)
+        return encode(state)
+
+    def restore(self, data):
+        """
+        Continue from snapshot() bytes, taken from this or any other Main.
+        The bag, RNG and preview are rebuilt by replaying the snapshot's
+        draws from its seed; timers resume on this game's clock.
+        """
+        state = decode(data)
+        if state['pieces_drawn'] <= len(self.next_shapes):
+            raise ValueError(f"snapshot has only {state['pieces_drawn']} pieces drawn")
+
+        # Bag, RNG and preview: replay the draws
+        self.seed = state['seed']
+        self.rng = random.Random(self.seed)
+        self.bag = create_7bag(self.rng)
+        self.pieces_drawn = 0
+        drawn = [self._draw_piece() for _ in range(state['pieces_drawn'])]
+        self.next_shapes = drawn[-len(self.next_shapes):]
+
+        game = self.game
+        game.set_board([list(row) for row in state['cells']])
+        tetromino = Tetrominos(state['shape'], game.game_data)
+        tetromino.rotation_index = state['rotation']
+        tetromino.pivot.update(state['x'], state['y'])
+        game.tetromino = tetromino
+        game.held_piece = state['held']
+        for name in FLAGS:
+            setattr(game, name, state[name])
+        game.current_move_dir = state['move_dir']
+        game.lock_move_count = state['lock_move_count']
+        game.current_score = state['score']
+        game.current_lines = state['lines']
+        game.current_level = state['level']
+        (game.num_1line, game.num_2line, game.num_3line,
+         game.num_tetris) = state['line_clears']
+        game.current_next_shape = self.next_shapes[0]
+        game.current_next_shapes = tuple(self.next_shapes)
+        game.current_bag = tuple(self.bag)
+
+        now = game.get_ticks()
+        for name, (active, since, duration) in zip(TIMER_NAMES, state['timers']):
+            timer = game.timerss[name]
+            timer.active = active
+            timer.started = since is not None
+            timer.duration = duration
+            timer.start_time = 0 if since is None else now - since
+
+        self.update_score(state['lines'], state['score'], state['level'])
+        self.held.held_shape = state['held']
+        self.score.start_time = self.score.now() - state['elapsed_ms'] / 1000
+        self.score.frozen_time = state['frozen_time']
+
+        if hasattr(game.ai, 'reset'):
+            game.ai.reset()
+        if state['ai_idle_ms'] is not None and hasattr(game.ai, 'last_action_time'):
+            game.ai.last_action_time = now - state['ai_idle_ms']
+
     def run(self):
         try:
+            if not self.render:
+                # Logic only, at the normal frame rate, until game over
+                while not self.game.is_game_over:
+                    self.game.run()
+                    if self.sim_clock is None:
+                        self.clock.tick(60)
+                self.score.frozen_time = self.score.elapsed()
+                return
+
             # ==== UNCOMMENT FOR NORMAL/STANDALONE MODE ====
+            # Static background once; each frame then updates only the
+            # changed board cells, the sidebar panels and the FPS counter.
+            self.display_surface.fill(GRAY)
+            pygame.display.update()
+            fps_font = get_font(16, "arial", bold=True)
+            fps_rect = pygame.Rect(10, 10, 0, 0)
+            fps_shown = None
             while True:
                 for event in pygame.event.get():
                     if event.type == pygame.QUIT:
                         pygame.quit()
                         exit()
 
-                self.display_surface.fill(GRAY)
-
                 if self.game.is_game_over:
+                    self.display_surface.fill(GRAY)
+
                     # Stop music on game over
                     if os.environ.get("SDL_VIDEODRIVER") != "dummy" and pygame.mixer.get_init() and pygame.mixer.music.get_busy():
                         pygame.mixer.music.stop()
 
                     if self.score.frozen_time is None:
-                        self.score.frozen_time = int(time.time() - self.score.start_time)
-                    self.score.run()
-                    self.lines.run()
-                    self.preview.run(self.next_shapes)
-                    self.held.run()
+                        self.score.frozen_time = self.score.elapsed()
+                    self.score.run(force=True)
+                    self.lines.run(force=True)
+                    self.preview.run(self.next_shapes, force=True)
+                    self.held.run(force=True)
 
                     # Optional: Show "Game Over"
-                    font = pygame.font.SysFont("arial", 48, bold=True)
-                    text = font.render("GAME OVER", True, (255, 0, 0))
+                    text = render_text(get_font(48, "arial", bold=True), "GAME OVER", (255, 0, 0))
                     text_rect = text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2))
                     self.display_surface.blit(text, text_rect)
 
                     # --- FPS Display ---
-                    fps_text = pygame.font.SysFont("arial", 16, bold=True).render(f"FPS: {int(self.clock.get_fps())}", True, (0, 255, 0))
+                    fps_text = render_text(fps_font, f"FPS: {int(self.clock.get_fps())}", (0, 255, 0))
                     self.display_surface.blit(fps_text, (10, 10))
 
                     pygame.display.update()
@@ -173,19 +316,30 @@ class Main:
                 self.lines.run()
                 self.preview.run(self.next_shapes)
                 self.held.run()
+                rects = self.game.dirty_rects + [
+                    panel.rect for panel in (self.score, self.lines, self.preview, self.held)
+                    if panel.dirty
+                ]
+
+                # --- FPS Display (redrawn when it changes or Held covered it) ---
+                fps = int(self.clock.get_fps())
+                if fps != fps_shown or self.held.dirty:
+                    fps_text = render_text(fps_font, f"FPS: {fps}", (0, 255, 0))
+                    self.display_surface.fill(GRAY, fps_rect)    # Erase last FPS text
+                    self.display_surface.blit(fps_text, (10, 10))
+                    rects.append(fps_rect.union(fps_text.get_rect(topleft=(10, 10))))
+                    fps_rect = fps_text.get_rect(topleft=(10, 10))
+                    fps_shown = fps
 
-                # --- FPS Display ---
-                fps_text = pygame.font.SysFont("arial", 16, bold=True).render(f"FPS: {int(self.clock.get_fps())}", True, (0, 255, 0))
-                self.display_surface.blit(fps_text, (10, 10))
-
-                pygame.display.update()
+                if rects:
+                    pygame.display.update(rects)
                 self.clock.tick(60)
             # ==============================================
         finally:
             self._cleanup()
 
     def _cleanup(self):
-        """Clean up both worker processes."""
+        """Clean up both worker processes (or release our pool endpoints)."""
         for conn in [self._play_conn, self._hold_conn]:
             if conn:
                 try:
@@ -1,19 +1,19 @@
 from settings import *
-from os import path
-from pygame.image import load
+from render_cache import shape_images
 
 class Preview:
-    def __init__(self):
+    def __init__(self, render=True):
+        self.render = render
+        self.dirty = False     # Redrawn by the last run()
+        self._drawn = None     # Preview queue on screen
+        if not render:
+            return    # Logic only: no Surfaces or images
         self.display_surface = pygame.display.get_surface()
         self.surface = pygame.Surface((SIDEBAR_WIDTH, GAME_HEIGHT * PREVIEW_HEIGHT_FRACTION - PADDING))
         self.rect = self.surface.get_rect(topright=(WINDOW_WIDTH - PADDING, PADDING))
 
-        # Load shape images
-        BASE_DIR = path.dirname(path.abspath(__file__))
-        self.shape_surfaces = {
-            shape: load(path.join(BASE_DIR, "assets", "graphics", f'{shape}.png')).convert_alpha()
-            for shape in TETROMINOS.keys()
-        }
+        # Shape images (loaded once per process)
+        self.shape_surfaces = shape_images()
 
         # Positioning settings
         self.top_padding = 20  # Extra space at the top
@@ -33,7 +33,15 @@ class Preview:
             shape_rect.topleft = (x, y)
             self.surface.blit(shape_surface, shape_rect)  # Blit the shape at its centered position
 
-    def run(self, next_shapes):
+    def run(self, next_shapes, force=False):
+        """Redraw only when the preview queue changed (or force)."""
+        self.dirty = False
+        if not self.render:
+            return
+        if not force and tuple(next_shapes) == self._drawn:
+            return
+        self._drawn = tuple(next_shapes)
+        self.dirty = True
         self.surface.fill(GRAY)  # Fill the surface with a background color
         self.display_pieces(next_shapes)
         self.display_surface.blit(self.surface, self.rect)  # Blit the surface to the display surface
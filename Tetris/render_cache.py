@@ -0,0 +1,62 @@
+"""
+Render Cache — Fonts, Text and Shape Images Shared by Every Panel
+
+Fonts and shape images are loaded once per process instead of once per
+panel (or, for the FPS counter, once per frame), and rendered text
+surfaces are memoized by (font, text, color). Together with the panels
+only rebuilding when their value changes, a frame with nothing new to
+show renders no text at all.
+"""
+
+from os import path
+
+import pygame
+from pygame.image import load
+
+from settings import TETROMINOS
+
+BASE_DIR = path.dirname(path.abspath(__file__))
+FONT_PATH = path.join(BASE_DIR, "assets", "graphics", "Russo_One.ttf")
+
+# Rendered text surfaces kept; the cache is cleared when full.
+TEXT_CACHE_SIZE = 1024
+
+_fonts = {}
+_texts = {}
+_shape_images = {}
+
+
+def get_font(size, name=None, bold=False):
+    """The game font (Russo One) at size, or SysFont(name) when name is given."""
+    key = (name, size, bold)
+    font = _fonts.get(key)
+    if font is None:
+        if name is None:
+            font = pygame.font.Font(FONT_PATH, size)
+        else:
+            font = pygame.font.SysFont(name, size, bold=bold)
+        _fonts[key] = font
+    return font
+
+
+def render_text(font, text, color):
+    """font.render(text, True, color), memoized. Fonts from get_font() only."""
+    # get_font() keeps every font alive, so id(font) is never reused.
+    key = (id(font), text, color)
+    surface = _texts.get(key)
+    if surface is None:
+        if len(_texts) >= TEXT_CACHE_SIZE:
+            _texts.clear()
+        surface = font.render(text, True, color)
+        _texts[key] = surface
+    return surface
+
+
+def shape_images():
+    """Preview image of every tetromino, keyed by shape (needs a display mode)."""
+    if not _shape_images:
+        for shape in TETROMINOS.keys():
+            _shape_images[shape] = load(
+                path.join(BASE_DIR, "assets", "graphics", f'{shape}.png')
+            ).convert_alpha()
+    return _shape_images
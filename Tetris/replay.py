@@ -0,0 +1,205 @@
+"""
+Replay — Seed + Per-Piece Moves, Fast-Forward Playback
+
+A Replay is a game's seed plus one record per locked piece, enough to
+re-create the whole game: the seed fixes the 7-bag sequence, and each
+record says where the piece went. Main(record=True), HeadlessGame and
+BatchTetrisEnv fill one in as they play; a 10-minute game (~4,000
+pieces) is about 4 KB.
+
+play() fast-forwards a replay through HeadlessGame (TetrisCore locks,
+clears and scoring, no search) in milliseconds; show() plays it back in
+the pygame window through Main, one piece every piece_ms.
+
+Format (version 1):
+    'TR' magic, version byte, seed length byte, seed (signed, little-endian)
+    one record per piece:
+        byte    bits 0-1 rotation, bits 2-5 pivot x + 2, bit 6 held first,
+                bit 7 lock row follows
+        [byte]  pivot y + 2, only when the piece did not lock where a
+                straight drop from spawn lands (soft-drop tucks, kicks)
+"""
+
+import os
+import sys
+
+from settings import BLOCK_OFFSET, COLUMNS, ROWS, TETROMINOS
+from core import TetrisCore
+
+REPLAY_MAGIC = b'TR'
+REPLAY_VERSION = 1
+
+_SPAWN_X = int(BLOCK_OFFSET.x)
+_SPAWN_Y = int(BLOCK_OFFSET.y)
+
+_HOLD = 0x40
+_LOCK_ROW = 0x80
+
+
+class Replay:
+    """Seed plus the per-piece move stream of one game."""
+
+    def __init__(self, seed, data=b''):
+        if not isinstance(seed, int):
+            raise ValueError(f"replays need an integer seed, got {seed!r}")
+        self.seed = seed
+        self.data = bytearray(data)
+        self._hold = False
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+    def hold(self):
+        """The current piece was swapped out; flags the next lock()."""
+        self._hold = True
+
+    def lock(self, rot, x, y=None):
+        """
+        Record a piece locking at pivot (rot, x). y is its pivot row when
+        that is not where a straight drop from spawn lands, else None.
+        """
+        record = rot | (x + 2) << 2 | (_HOLD if self._hold else 0)
+        self._hold = False
+        if y is None:
+            self.data.append(record)
+        else:
+            self.data.append(record | _LOCK_ROW)
+            self.data.append(y + 2)
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+    def moves(self):
+        """Yield (rot, x, hold, y) per piece; y is None for a straight drop."""
+        data = self.data
+        i = 0
+        while i < len(data):
+            record = data[i]
+            y = None
+            if record & _LOCK_ROW:
+                i += 1
+                y = data[i] - 2
+            yield record & 3, (record >> 2 & 0xF) - 2, bool(record & _HOLD), y
+            i += 1
+
+    def __len__(self):
+        return sum(1 for _ in self.moves())
+
+    # ------------------------------------------------------------------
+    # Serialization
+    # ------------------------------------------------------------------
+    def to_bytes(self):
+        seed_len = self.seed.bit_length() // 8 + 1
+        return (REPLAY_MAGIC + bytes((REPLAY_VERSION, seed_len))
+                + self.seed.to_bytes(seed_len, 'little', signed=True) + self.data)
+
+    @classmethod
+    def from_bytes(cls, data):
+        data = bytes(data)
+        if data[:2] != REPLAY_MAGIC or len(data) < 4:
+            raise ValueError("not a Tetris replay")
+        if data[2] != REPLAY_VERSION:
+            raise ValueError(f"unsupported replay version {data[2]} "
+                             f"(expected {REPLAY_VERSION})")
+        seed_len = data[3]
+        seed = int.from_bytes(data[4:4 + seed_len], 'little', signed=True)
+        return cls(seed, data[4 + seed_len:])
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+
+def play(replay, max_pieces=None):
+    """
+    Re-simulate a replay through TetrisCore (no search, no clock).
+
+    Returns:
+        The HeadlessGame after the last recorded piece (score, lines,
+        num_tetris, grid, ... as they were when the recording stopped).
+    """
+    from headless import HeadlessGame
+
+    game = HeadlessGame(seed=replay.seed)
+    for rot, x, hold, y in replay.moves():
+        if game.is_game_over or (max_pieces is not None and game.pieces >= max_pieces):
+            break
+        if hold:
+            game.hold_piece()
+        blocks = TETROMINOS[game.shape]['rotations'][rot]
+        if y is None:
+            y = TetrisCore.hard_drop_y_fast(game.grid, blocks, x, _SPAWN_Y,
+                                            COLUMNS, ROWS)
+        game.lock(blocks, x, y)
+    return game
+
+
+class ReplayAI:
+    """
+    Game AI that places each piece where the replay says (for show()).
+    A new piece is moved to its recorded rotation and column at once,
+    so gravity and lock delay keep it on course, and is hard-dropped
+    piece_ms later.
+    """
+
+    def __init__(self, game, replay=None, piece_ms=100, **kwargs):
+        self.game = game
+        self._moves = replay.moves()
+        self.piece_ms = piece_ms
+        self._placed = None          # Tetromino already moved into position
+        self._placed_time = 0
+
+    def update(self, next_shape, held_piece=None, is_held=False, next_shapes=None,
+               bag=None):
+        game = self.game
+        if game.is_game_over:
+            return
+        now = game.get_ticks()
+
+        if game.tetromino is self._placed:
+            if now - self._placed_time >= self.piece_ms:
+                game.perform_hard_drop()
+            return
+
+        move = next(self._moves, None)
+        if move is None:
+            game.is_game_over = True    # End of the recording
+            return
+        rot, x, hold, y = move
+        if hold:
+            game.hold_piece()
+        tetromino = game.tetromino
+        tetromino.rotation_index = rot
+        tetromino.pivot.update(x, _SPAWN_Y if y is None else y)
+        if y is not None:
+            game.lock_tetromino()    # Tucked in below its drop row: lock in place
+            return
+        self._placed = tetromino
+        self._placed_time = now
+
+
+def show(replay, piece_ms=100):
+    """Play a replay back in the game window, one piece every piece_ms."""
+    from main import Main
+
+    main = Main(seed=replay.seed, use_async_ai=False, ai_class=ReplayAI,
+                ai_kwargs={'replay': replay, 'piece_ms': piece_ms})
+    main.run()
+
+
+if __name__ == "__main__":
+    # python replay.py <file.replay> [piece_ms]   (0 ms = fast-forward only)
+    replay = Replay.load(sys.argv[1])
+    piece_ms = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    if piece_ms <= 0:
+        g = play(replay)
+        print(f"{os.path.basename(sys.argv[1])}: {len(replay)} pieces, "
+              f"score {g.score}, lines {g.lines}, tetrises {g.num_tetris}, "
+              f"game over {g.is_game_over}")
+    else:
+        show(replay, piece_ms)
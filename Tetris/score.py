@@ -1,22 +1,26 @@
 from settings import *
-from os import path
+from render_cache import get_font, render_text
 import time
 
 class Score:
-    def __init__(self):
-        self.display_surface = pygame.display.get_surface()
-        preview_height = GAME_HEIGHT * PREVIEW_HEIGHT_FRACTION
-        score_height = GAME_HEIGHT - preview_height
-        self.surface = pygame.Surface((SIDEBAR_WIDTH, score_height))
-        self.rect = self.surface.get_rect(topright=(WINDOW_WIDTH - PADDING, preview_height + PADDING))
+    def __init__(self, render=True, sim_clock=None):
+        self.render = render
+        self.sim_clock = sim_clock    # timers.SimClock, or None for wall time
+        self.dirty = False            # Redrawn by the last run()
+        self._drawn = None            # (score, seconds) on screen
+        if render:
+            self.display_surface = pygame.display.get_surface()
+            preview_height = GAME_HEIGHT * PREVIEW_HEIGHT_FRACTION
+            score_height = GAME_HEIGHT - preview_height
+            self.surface = pygame.Surface((SIDEBAR_WIDTH, score_height))
+            self.rect = self.surface.get_rect(topright=(WINDOW_WIDTH - PADDING, preview_height + PADDING))
 
-        # Font
-        BASE_DIR = path.dirname(path.abspath(__file__))
-        self.font = pygame.font.Font(path.join(BASE_DIR, "assets", "graphics", "Russo_One.ttf"), 20)
+            # Font (shared by every panel)
+            self.font = get_font(20)
 
-        # Positioning
-        self.top_padding = 20
-        self.increment_height = (self.surface.get_height() - self.top_padding) // 2  # For score and time
+            # Positioning
+            self.top_padding = 20
+            self.increment_height = (self.surface.get_height() - self.top_padding) // 2  # For score and time
 
         # Data
         self.score = 0
@@ -26,9 +30,19 @@ class Score:
 
         # The next two lines are for standalone only, comment or remove in tray mode:
 
-        self.start_time = time.time()
+        self.start_time = self.now()
         self.frozen_time = None  # Stores time at game over
 
+    def now(self):
+        """Current time in seconds on the game's clock."""
+        if self.sim_clock is not None:
+            return self.sim_clock() / 1000
+        return time.time()
+
+    def elapsed(self):
+        """Whole seconds since the game started."""
+        return int(self.now() - self.start_time)
+
     def format_time(self, seconds):
         """Converts seconds to hh:mm:ss format."""
         hours = seconds // 3600
@@ -37,18 +51,27 @@ class Score:
         return f"{hours:02}:{minutes:02}:{seconds:02}"
 
     def display_text(self, pos, text):
-        text_surface = self.font.render(text, True, LINE_COLOR)
+        text_surface = render_text(self.font, text, LINE_COLOR)
         text_rect = text_surface.get_rect(center=pos)
         self.surface.blit(text_surface, text_rect)
 
-    def run(self):
-        self.surface.fill(GRAY)
+    def run(self, force=False):
+        """Redraw only when the score or the shown second changed (or force)."""
+        self.dirty = False
+        if not self.render:
+            return
 
         # Freeze time if game is over
         if self.frozen_time is not None:
             elapsed_seconds = self.frozen_time
         else:
-            elapsed_seconds = int(time.time() - self.start_time)
+            elapsed_seconds = self.elapsed()
+
+        if not force and (self.score, elapsed_seconds) == self._drawn:
+            return
+        self._drawn = (self.score, elapsed_seconds)
+        self.dirty = True
+        self.surface.fill(GRAY)
 
         formatted_time = self.format_time(elapsed_seconds)
 
@@ -0,0 +1,145 @@
+"""
+Snapshot — Compact, Versioned Save States of a Running Game
+
+Main.snapshot() collects the game state into a dict and encode() packs
+it into ~210 bytes; decode() and Main.restore() reverse it. The 7-bag RNG
+is not stored: a snapshot keeps the seed and the number of pieces drawn,
+and the bag, RNG state and preview are rebuilt by replaying those draws
+(a few thousand list pops even for a 10-minute game). Timer and clock
+values are stored relative to the moment of the snapshot, so a state
+taken on the wall clock can be restored on a SimClock and vice versa.
+
+Layout (little-endian, version 1):
+    'TS' magic, version byte
+    seed            length byte + signed int
+    header          _HEADER (piece, hold, flags, counters, clocks)
+    timers          _TIMER per TIMER_NAMES entry
+    cells           ROWS * COLUMNS nibbles, 0 = empty, else SHAPES index + 1
+                    (Game.game_data holds each locked cell's piece color)
+
+Every field is read back by decode(); a new field needs a new version.
+"""
+
+import struct
+
+from settings import COLUMNS, ROWS, TETROMINOS
+
+SNAPSHOT_MAGIC = b'TS'
+SNAPSHOT_VERSION = 1
+
+SHAPES = tuple(TETROMINOS.keys())
+_SHAPE_INDEX = {shape: i for i, shape in enumerate(SHAPES)}
+_COLOR_CODE = {TETROMINOS[shape]['color']: i + 1 for i, shape in enumerate(SHAPES)}
+_CODE_COLOR = {code: color for color, code in _COLOR_CODE.items()}
+
+# Game.timerss keys, in the order they are stored
+TIMER_NAMES = ('vertical move', 'horizontal move', 'rotate', 'lock delay')
+
+# Bit per boolean in the header's flags byte
+FLAGS = ('is_held', 'is_game_over', 'lock_timer_active', 'is_fast_drop',
+         'hard_drop_in_progress')
+
+_PREFIX = struct.Struct('<2sBB')    # magic, version, seed length
+_HEADER = struct.Struct(
+    '<I'        # pieces drawn from the bag (incl. preview)
+    'BBbb'      # active piece: shape, rotation, pivot x, pivot y
+    'BBbB'      # held shape (0 = none), flags, move dir, lock move count
+    'QIH'       # score, lines, level
+    'IIII'      # 1-line, 2-line, 3-line and tetris clears
+    'Iii'       # ms since start, frozen seconds (-1 = running), ms since AI action (-1 = n/a)
+)
+_TIMER = struct.Struct('<Bid')      # 1 active | 2 started, ms since start, duration
+
+_CELL_BYTES = (ROWS * COLUMNS + 1) // 2
+
+
+def encode(state):
+    """Pack a Main.snapshot() state dict into bytes."""
+    seed = state['seed']
+    if not isinstance(seed, int):
+        raise ValueError(f"snapshots need an integer seed, got {seed!r}")
+    seed_len = seed.bit_length() // 8 + 1
+    flags = sum(1 << i for i, name in enumerate(FLAGS) if state[name])
+    held = state['held']
+    parts = [
+        _PREFIX.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, seed_len),
+        seed.to_bytes(seed_len, 'little', signed=True),
+        _HEADER.pack(
+            state['pieces_drawn'],
+            _SHAPE_INDEX[state['shape']], state['rotation'], state['x'], state['y'],
+            0 if held is None else _SHAPE_INDEX[held] + 1, flags,
+            state['move_dir'], state['lock_move_count'],
+            state['score'], state['lines'], state['level'],
+            *state['line_clears'],
+            state['elapsed_ms'],
+            -1 if state['frozen_time'] is None else state['frozen_time'],
+            -1 if state['ai_idle_ms'] is None else state['ai_idle_ms'],
+        ),
+    ]
+    for active, since, duration in state['timers']:
+        started = since is not None
+        parts.append(_TIMER.pack(active | started << 1, since if started else 0, duration))
+
+    nibbles = [_COLOR_CODE[cell] if cell else 0
+               for row in state['cells'] for cell in row]
+    nibbles.append(0)    # Pad odd cell counts
+    parts.append(bytes(nibbles[i] | nibbles[i + 1] << 4
+                       for i in range(0, ROWS * COLUMNS, 2)))
+    return b''.join(parts)
+
+
+def decode(data):
+    """Unpack snapshot bytes into the state dict Main.restore() applies."""
+    data = bytes(data)
+    if len(data) < _PREFIX.size:
+        raise ValueError("snapshot too short")
+    magic, version, seed_len = _PREFIX.unpack_from(data)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError("not a Tetris snapshot")
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"unsupported snapshot version {version} "
+                         f"(expected {SNAPSHOT_VERSION})")
+    expected = (_PREFIX.size + seed_len + _HEADER.size
+                + _TIMER.size * len(TIMER_NAMES) + _CELL_BYTES)
+    if len(data) != expected:
+        raise ValueError(f"snapshot is {len(data)} bytes, expected {expected}")
+
+    offset = _PREFIX.size
+    seed = int.from_bytes(data[offset:offset + seed_len], 'little', signed=True)
+    offset += seed_len
+    (pieces_drawn, shape, rotation, x, y, held, flags, move_dir, lock_move_count,
+     score, lines, level, n1, n2, n3, n4,
+     elapsed_ms, frozen_time, ai_idle_ms) = _HEADER.unpack_from(data, offset)
+    offset += _HEADER.size
+
+    timers = []
+    for _ in TIMER_NAMES:
+        bits, since, duration = _TIMER.unpack_from(data, offset)
+        offset += _TIMER.size
+        timers.append((bool(bits & 1), since if bits & 2 else None, duration))
+
+    nibbles = []
+    for byte in data[offset:]:
+        nibbles.append(byte & 0xF)
+        nibbles.append(byte >> 4)
+    cells = [[_CODE_COLOR[n] if n else 0
+              for n in nibbles[y * COLUMNS:(y + 1) * COLUMNS]]
+             for y in range(ROWS)]
+
+    state = {
+        'seed': seed,
+        'pieces_drawn': pieces_drawn,
+        'shape': SHAPES[shape], 'rotation': rotation, 'x': x, 'y': y,
+        'held': SHAPES[held - 1] if held else None,
+        'move_dir': move_dir, 'lock_move_count': lock_move_count,
+        'score': score, 'lines': lines, 'level': level,
+        'line_clears': (n1, n2, n3, n4),
+        'elapsed_ms': elapsed_ms,
+        'frozen_time': None if frozen_time < 0 else frozen_time,
+        'ai_idle_ms': None if ai_idle_ms < 0 else ai_idle_ms,
+        'timers': tuple(timers),
+        'cells': cells,
+    }
+    for i, name in enumerate(FLAGS):
+        state[name] = bool(flags & 1 << i)
+    return state
@@ -1,28 +1,80 @@
 from pygame.time import get_ticks
 
+class SimClock:
+    """
+    Simulated clock: a get_ticks() stand-in (milliseconds) that only moves
+    when advance() is called. Game.run() advances it one frame per call, so
+    gravity, lock delay, DAS and AI pacing follow game frames, not wall time.
+
+    hold() keeps it still while the AI waits on its workers, so a game's
+    result does not depend on how fast they answer. The first
+    max_held_frames calls of a wait only skip the frame (other games of a
+    tray keep running); after that hold() blocks on the AI's
+    wait_for_reply(). Wall time only guards against a dead worker: a
+    reply still missing after worker_timeout_ms lets the clock run on
+    until the wait ends, and from then on the game is no longer
+    reproducible.
+    """
+    def __init__(self, quantum=1000 / 60, max_held_frames=120, worker_timeout_ms=10000):
+        self.quantum = quantum
+        self.ticks = quantum    # The first frame ends one quantum in
+        self.max_held_frames = max_held_frames
+        self.worker_timeout_ms = worker_timeout_ms
+        self._held_frames = 0       # Frames skipped by the current wait
+        self._timed_out = False     # The current wait outlived worker_timeout_ms
+
+    def __call__(self):
+        return int(self.ticks)
+
+    def advance(self, ms=None):
+        self.ticks += self.quantum if ms is None else ms
+
+    def hold(self, ai):
+        """
+        True if this frame should not advance because the AI is still
+        waiting for its workers (ai.waiting).
+        """
+        if not getattr(ai, 'waiting', False):
+            self._held_frames = 0
+            self._timed_out = False
+            return False
+        if self._timed_out:
+            return False
+        self._held_frames += 1
+        if self._held_frames <= self.max_held_frames:
+            return True
+        if ai.wait_for_reply(self.worker_timeout_ms / 1000):
+            return True    # Picked up by the AI's next update()
+        self._timed_out = True
+        return False
+
 class Timer:
-    def __init__(self, duration, repeated=False, func=None):
+    def __init__(self, duration, repeated=False, func=None, clock=get_ticks):
         self.repeated = repeated
         self.func = func
         self.duration = duration
+        self.clock = clock
 
         self.start_time = 0
         self.active = False
+        self.started = False    # start_time is set (activate() since the last deactivate())
 
     def activate(self):
         self.active = True
-        self.start_time = get_ticks()
+        self.started = True
+        self.start_time = self.clock()
 
     def deactivate(self):
         self.active = False
+        self.started = False
         self.start_time = 0
 
     def update(self):
-        current_time = get_ticks()
+        current_time = self.clock()
         if current_time - self.start_time >= self.duration and self.active:
 
             # call a function
-            if self.func and self.start_time != 0:
+            if self.func and self.started:
                 self.func()
 
             # reset timer
@@ -35,4 +87,4 @@ class Timer:
     def set_interval(self, duration):
         self.duration = duration
         if self.active:
-            self.start_time = get_ticks()
\ No newline at end of file
+            self.start_time = self.clock()
\ No newline at end of file